@@ -0,0 +1,39 @@
+"""Benchmarks for pytest-benchmark, not collected by the test run. Save a run and compare a later one against it with
+
+    pytest benchmarks --no-cov --benchmark-autosave
+    pytest benchmarks --no-cov --benchmark-compare --benchmark-compare-fail=mean:15%
+
+tox -e benchmark saves a run, tox -e benchmark-compare fails if a mean got more than 15% slower than the last run"""
+import os
+from typing import Any, Callable, Dict, Type
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+# pylint: disable=C0413
+from magiqt.application import Application
+from magiqt.field.fields import FloatField, IntegerField, StringField
+from magiqt.layout_manager.form import Form
+
+
+@pytest.fixture(scope="session")
+def app() -> Application:
+    return Application(use_sys_argv=False)
+
+
+def _make_form(fields: int, depth: int = 1) -> Type[Form]:
+    """Form class with fields fields per level and depth levels of nested forms"""
+    attributes: Dict[str, Any] = {}
+    for i in range(fields):
+        kind = (IntegerField, FloatField, StringField)[i % 3]
+        attributes[f"field_{i}"] = kind(f"Field {i}")
+    if depth > 1:
+        attributes["sub"] = _make_form(fields, depth - 1)("Sub")
+    return type(f"Form{fields}x{depth}", (Form,), attributes)
+
+
+@pytest.fixture(scope="session")
+def make_form() -> Callable[..., Type[Form]]:
+    """make_form(fields, depth=1): Form class with fields fields per level and depth levels of nested forms"""
+    return _make_form
@@ -0,0 +1,78 @@
+import subprocess
+import sys
+
+import pytest
+
+from magiqt.main import TestForm
+
+
+@pytest.mark.parametrize("fields", [10, 100, 1000])
+def test_build_fields(benchmark, app, fields, make_form):
+    form_class = make_form(fields)
+    benchmark(form_class.build, "Benchmark")
+
+
+@pytest.mark.parametrize("depth", [1, 3, 6])
+def test_build_depth(benchmark, app, depth, make_form):
+    form_class = make_form(10, depth)
+    benchmark(form_class.build, "Benchmark")
+
+
+@pytest.mark.parametrize("fields", [100, 1000])
+def test_build_headless(benchmark, fields, make_form):
+    form_class = make_form(fields)
+    benchmark(form_class.build, "Benchmark", headless=True)
+
+
+def test_build_lazy(benchmark, app, make_form):
+    form_class = make_form(100, 6)
+    benchmark(form_class.build, "Benchmark", lazy=True)
+
+
+def test_get_top_level(benchmark, app):
+    form = TestForm.build("Benchmark")
+    benchmark(lambda: form.mass)
+
+
+def test_get_nested(benchmark, app):
+    form = TestForm.build("Benchmark")
+    benchmark(lambda: form.config.employee.number)
+
+
+def test_set_nested(benchmark, app):
+    form = TestForm.build("Benchmark")
+
+    def _set():
+        form.config.employee.number = 1
+
+    benchmark(_set)
+
+
+def test_as_dict(benchmark, app, make_form):
+    form = make_form(100, 3).build("Benchmark")
+    benchmark(form.as_dict)
+
+
+def test_set_from_dict(benchmark, app, make_form):
+    form = make_form(100).build("Benchmark")
+    values = {f"field_{i}": i for i in range(100)}
+    benchmark(form.set_from_dict, values)
+
+
+@pytest.mark.parametrize("headless", [True, False])
+def test_snapshot(benchmark, app, headless, make_form):
+    form = make_form(5000).build("Benchmark", headless=headless)
+    form.set_from_dict({f"field_{i}": i for i in range(5000)})
+    benchmark(form.snapshot)
+
+
+def test_restore(benchmark, app, make_form):
+    form = make_form(5000).build("Benchmark", headless=True)
+    form.set_from_dict({f"field_{i}": i for i in range(5000)})
+    benchmark(form.restore, form.snapshot())
+
+
+def test_import(benchmark):
+    """Fresh interpreter importing the declarations, Qt and NumPy are not loaded until used"""
+    command = [sys.executable, "-c", "import magiqt.field.fields, magiqt.layout_manager.form, unit_system.quantity"]
+    benchmark.pedantic(subprocess.run, args=(command,), kwargs={"check": True}, rounds=10)
@@ -0,0 +1,49 @@
+import pytest
+
+from magiqt.field.fields import DropDown
+from magiqt.field.range import MappedRange
+from magiqt.widgets.input.combo_box import ComboBox
+
+from magiqt.widgets.input.completion import CompletionIndex
+
+ITEMS = 100_000
+
+
+@pytest.fixture(scope="module")
+def part_numbers():
+    return MappedRange({f"PN-{i:06d}": i for i in range(ITEMS)})
+
+
+def test_combo_box_create_and_show(benchmark, app, part_numbers):
+    def create():
+        combo = ComboBox(DropDown("Part number", range=part_numbers))
+        combo.show()
+        app.processEvents()
+        combo.deleteLater()
+
+    benchmark(create)
+
+
+def test_combo_box_select_by_text(benchmark, app, part_numbers):
+    combo = ComboBox(DropDown("Part number", range=part_numbers))
+    benchmark(combo.setText, f"PN-{ITEMS - 1:06d}")
+
+
+def test_combo_box_scroll(benchmark, app, part_numbers):
+    combo = ComboBox(DropDown("Part number", range=part_numbers))
+    combo.showPopup()
+    app.processEvents()
+    view = combo.view()
+    bar = view.verticalScrollBar()
+
+    def scroll():
+        bar.setValue((bar.value() + bar.pageStep()) % bar.maximum())
+        view.viewport().repaint()
+
+    benchmark(scroll)
+    combo.hidePopup()
+
+
+def test_completion_search(benchmark, part_numbers):
+    index = CompletionIndex(part_numbers.gui_items())
+    benchmark(index.search, "99", 200)
@@ -0,0 +1,39 @@
+import time
+
+import pytest
+from PyQt5.QtCore import Qt
+from PyQt5.QtTest import QTest
+
+from magiqt.field.fields import FloatField
+from magiqt.layout_manager.form import Form
+
+TIMEOUT_S = 5
+
+
+def test_keystroke_to_on_change(benchmark, app):
+    """A key press until on_change of its form has run"""
+    calls = []
+
+    class Typed(Form):
+        value = FloatField("Value")
+
+        def on_change(self, attr, this_item):
+            calls.append(attr)
+            return True
+
+    form = Typed.build("Benchmark")
+    form.show()
+    edit = form.node.children["value"].widgets[1]
+    edit.setText("1")
+
+    def keystroke():
+        expected = len(calls) + 1
+        QTest.keyClick(edit, Qt.Key_Backspace)
+        QTest.keyClick(edit, Qt.Key_1)
+        deadline = time.monotonic() + TIMEOUT_S
+        while len(calls) < expected:
+            if time.monotonic() > deadline:
+                pytest.fail(f"on_change did not run within {TIMEOUT_S} s of the keystroke")
+            app.processEvents()
+
+    benchmark(keystroke)
@@ -0,0 +1,24 @@
+import pytest
+
+from unit_system.quantity import Pressure, Temperature
+
+
+def test_convert_by_name(benchmark):
+    benchmark(Pressure.convert, 1.5, "bar(g)", "Pa")
+
+
+def test_convert_by_unit(benchmark):
+    celsius, kelvin = Temperature["℃"], Temperature["K"]
+    benchmark(Temperature.convert, 20.0, celsius, kelvin)
+
+
+def test_convert_array(benchmark):
+    np = pytest.importorskip("numpy")
+    pascal = np.linspace(0.0, 1e6, 1_000_000)
+    benchmark(Pressure.convert, pascal, "Pa", "bar(g)")
+
+
+def test_convert_array_in_place(benchmark):
+    np = pytest.importorskip("numpy")
+    pascal = np.linspace(0.0, 1e6, 1_000_000)
+    benchmark(Pressure.convert_array, pascal, "Pa", "Pa", out=pascal)
@@ -0,0 +1,35 @@
+import random
+
+import pytest
+
+from magiqt.field.range import FloatRange, IntRange
+from magiqt.field.validator import CachedValidator, FloatValidator, IntValidator
+
+ROWS = 100_000
+
+
+@pytest.fixture(scope="module")
+def float_texts():
+    rng = random.Random(1)
+    return [str(rng.uniform(-100, 100)) if rng.random() > 0.05 else "" for _ in range(ROWS)]
+
+
+def test_float_validate(benchmark, float_texts):
+    validator = FloatValidator(FloatRange(0, 50))
+    benchmark(lambda: [validator.validate(text) for text in float_texts[:10_000]])
+
+
+def test_float_validate_many(benchmark, float_texts):
+    validator = FloatValidator(FloatRange(0, 50))
+    benchmark(validator.validate_many, float_texts)
+
+
+def test_int_validate_many(benchmark):
+    texts = [str(i) for i in range(ROWS)]
+    validator = IntValidator(IntRange(0, 50_000))
+    benchmark(validator.validate_many, texts)
+
+
+def test_cached_validate(benchmark):
+    validator = CachedValidator(FloatValidator(FloatRange(0, 50)))
+    benchmark(validator.validate, "12.5")
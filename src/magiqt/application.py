@@ -1,19 +1,154 @@
 from __future__ import annotations
 
+import asyncio
+import math
+import selectors
 import sys
 import traceback
+from asyncio.events import Handle, TimerHandle
 from types import TracebackType
-from typing import Optional, List, Type
+from typing import Optional, List, Type, Coroutine, Any, TypeVar, Callable, Dict, Tuple
 
+from PyQt5.QtCore import QEventLoop, QSocketNotifier, QTimer, Qt
 from PyQt5.QtWidgets import QApplication
 
+_T = TypeVar("_T")
+
+# Loop iterations per step before Qt gets to process its events, for callbacks that keep scheduling callbacks
+_MAX_ITERATIONS = 100
+
+
+class _QtSelector(selectors.DefaultSelector):  # pylint: disable=R0901
+    """Selector of the asyncio loop of Application. Qt watches the registered files with QSocketNotifiers, so
+    select never blocks: when the loop would wait, it stops and keeps the timeout it would have waited for"""
+
+    def __init__(self, wake: Callable[[], None]) -> None:
+        super().__init__()
+        self.wake = wake
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        # Seconds until the next scheduled callback when the loop stopped, None if there is none
+        self.timeout: Optional[float] = None
+        self.iterations = 0
+        self._notifiers: Dict[int, List[QSocketNotifier]] = {}
+
+    def register(self, fileobj: Any, events: int, data: Any = None) -> selectors.SelectorKey:
+        key = super().register(fileobj, events, data)
+        self._watch(key.fd, events)
+        return key
+
+    def unregister(self, fileobj: Any) -> selectors.SelectorKey:
+        key = super().unregister(fileobj)
+        self._watch(key.fd, 0)
+        return key
+
+    def modify(self, fileobj: Any, events: int, data: Any = None) -> selectors.SelectorKey:
+        key = super().modify(fileobj, events, data)
+        self._watch(key.fd, events)
+        return key
+
+    def close(self) -> None:
+        for fd in list(self._notifiers):
+            self._watch(fd, 0)
+        super().close()
+
+    def select(self, timeout: Optional[float] = None) -> List[Tuple[selectors.SelectorKey, int]]:
+        events = super().select(0)
+        self.iterations += 1
+        busy = bool(events) or (timeout is not None and timeout <= 0)
+        if busy and self.iterations < _MAX_ITERATIONS:
+            return events
+        self.timeout = 0 if busy else timeout
+        if self.loop is not None:
+            self.loop.stop()
+        return events
+
+    def _watch(self, fd: int, events: int) -> None:
+        for notifier in self._notifiers.pop(fd, ()):
+            try:
+                notifier.setEnabled(False)
+            except RuntimeError:
+                # Already deleted by Qt when the loop is collected after the application at exit
+                pass
+        notifiers = []
+        kinds = ((selectors.EVENT_READ, QSocketNotifier.Read), (selectors.EVENT_WRITE, QSocketNotifier.Write))
+        for flag, kind in kinds:
+            if events & flag:
+                notifier = QSocketNotifier(fd, kind)  # type: ignore
+                notifier.activated.connect(self.wake)
+                notifiers.append(notifier)
+        if notifiers:
+            self._notifiers[fd] = notifiers
+
+
+class _QtEventLoop(asyncio.SelectorEventLoop):
+    """Wakes the application when callbacks are scheduled from Qt code, while the loop is not running"""
+
+    def __init__(self, selector: _QtSelector) -> None:
+        self._qt_selector = selector
+        super().__init__(selector)
+        selector.loop = self
+
+    def call_soon(self, callback: Callable[..., Any], *args: Any, context: Any = None) -> Handle:  # type: ignore
+        handle = super().call_soon(callback, *args, context=context)
+        if not self.is_running():
+            self._qt_selector.wake()
+        return handle
+
+    def call_at(  # type: ignore
+        self, when: float, callback: Callable[..., Any], *args: Any, context: Any = None
+    ) -> TimerHandle:
+        handle = super().call_at(when, callback, *args, context=context)
+        if not self.is_running():
+            self._qt_selector.wake()
+        return handle
+
 
 class Application(QApplication):
+    """QApplication with an asyncio event loop run by the Qt event loop. The loop runs when one of its files is
+    ready, when a callback is due, or when one is scheduled, and not in between"""
+
     def __init__(self, argv: Optional[List[str]] = None, use_sys_argv: bool = True):
         argv = argv if argv is not None else []
         if use_sys_argv:
             argv = sys.argv + argv
         super().__init__(argv)
+        self._async_timer = QTimer(self)
+        self._async_timer.setSingleShot(True)
+        self._async_timer.setTimerType(Qt.PreciseTimer)
+        self._async_timer.timeout.connect(self._step_loop)
+        self._selector = _QtSelector(self._wake)
+        self.loop = _QtEventLoop(self._selector)
+        self.aboutToQuit.connect(self._cancel_tasks)
+
+    def create_task(self, coroutine: Coroutine[Any, Any, _T]) -> asyncio.Task[_T]:
+        """Schedule coroutine on the loop of the application. It runs while Qt processes events"""
+        return self.loop.create_task(coroutine)
+
+    def run_until_complete(self, coroutine: Coroutine[Any, Any, _T]) -> _T:
+        """Run coroutine while processing Qt events, for scripts and tests"""
+        task = self.create_task(coroutine)
+        while not task.done():
+            self.processEvents(QEventLoop.WaitForMoreEvents)
+        return task.result()
+
+    def _wake(self) -> None:
+        # Not stepped here, as notifiers must not be deleted while they emit
+        self._async_timer.start(0)
+
+    def _step_loop(self) -> None:
+        if self.loop.is_running() or self.loop.is_closed():
+            return
+        self._selector.iterations = 0
+        self._selector.timeout = None
+        self.loop.run_forever()
+        timeout = self._selector.timeout
+        if timeout is not None:
+            self._async_timer.start(math.ceil(timeout * 1000))
+
+    def _cancel_tasks(self) -> None:
+        for task in asyncio.all_tasks(self.loop):
+            task.cancel()
+        self._step_loop()
 
 
 def excepthook(exc_type: Type[BaseException], exc_value: BaseException, exc_tb: Optional[TracebackType]) -> None:
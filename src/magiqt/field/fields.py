@@ -1,9 +1,32 @@
 from __future__ import annotations
-from dataclasses import dataclass
-from typing import Generic, Type, overload, Tuple, Any, Optional, Union, TypeVar, Callable
+from dataclasses import dataclass, field
+from typing import (
+    Generic,
+    Type,
+    overload,
+    Tuple,
+    Any,
+    Optional,
+    Union,
+    TypeVar,
+    Callable,
+    TYPE_CHECKING,
+    Sequence,
+    Dict,
+    cast,
+)
 
+from unit_system.quantity import QuantityType, Unitless
 from magiqt.field.range import IntRange, AnyRange, FloatRange, ItemRange, ListRange
-from magiqt.field.validator import IntValidator, AnyValidator, FloatValidator, ItemRangeValidator
+from magiqt.field.validator import (
+    IntValidator,
+    AnyValidator,
+    FloatValidator,
+    ItemRangeValidator,
+    CachedValidator,
+    UnitValidator,
+    localized,
+)
 from magiqt.interface import (
     Validator,
     Range,
@@ -12,32 +35,115 @@ from magiqt.interface import (
     Declaration,
     _Converted,
     DeclarationItem,
+    IsEditable,
 )
-from magiqt.widgets.label import Label
-from magiqt.widgets.group_box import GroupBox
-from magiqt.widgets.input.line_edit import LineEdit
-from magiqt.widgets.input.combo_box import ComboBox
+
+# Widget modules are imported when widgets are created, declarations load without Qt
+if TYPE_CHECKING:
+    from PyQt5.QtWidgets import QWidget
+    from magiqt.widgets.label import Label
+    from magiqt.widgets.unit_box import UnitBox
+    from magiqt.widgets.group_box import GroupBox
+    from magiqt.widgets.input.line_edit import LineEdit
+    from magiqt.widgets.input.combo_box import ComboBox
+    from magiqt.layout_manager.history import History
+    from magiqt.layout_manager.dependencies import DependencyGraph
 
 
 _Field = TypeVar("_Field", bound="FieldBase[Any, Any]")
 
 
+def _history(this_node: DeclarationItem) -> Optional[History]:
+    return getattr(this_node.root().handle, "history", None)
+
+
+def recompute_downstream(this_node: DeclarationItem) -> None:
+    """Recompute the computed fields of the containers of this_node that depend on it, directly or not"""
+    path: Tuple[str, ...] = (this_node.declaration.attribute_name,)
+    container = this_node.parent
+    while container is not None:
+        graph: Optional[DependencyGraph] = getattr(container.declaration, "dependencies", None)
+        if graph is not None and path in graph.downstream:
+            for name in graph.downstream[path]:
+                child = container.children[name]
+                if cast(ComputedField, child.declaration).compute(child) and container.parent is not None:
+                    # Containers further up may use the computed field itself
+                    recompute_downstream(child)
+        path = (container.declaration.attribute_name,) + path
+        container = container.parent
+
+
 @dataclass
 class FieldBase(Declaration[_Converted], Generic[_Value, _Converted]):
     name: str
     validator: Type[Validator[_Value, _Converted]]
     range: Range[_Value, _Converted]
     read_only: bool = False
+    _cached_validator: Optional[CachedValidator[_Value, _Converted]] = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __set_name__(self, owner: Any, name: str) -> None:
+        super().__set_name__(owner, name)
+        # Reported by magiqt.profiling, fields of the same name in other forms are counted separately
+        self.qualified_name = f"{owner.__qualname__}.{name}"  # pylint: disable=W0201
+
+    def cached_validator(self) -> CachedValidator[_Value, _Converted]:
+        """Validator of this field, shared by all its widgets, that parses each distinct text once"""
+        cached = self._cached_validator
+        if cached is None or cached.wrapped.range is not self.range or not isinstance(cached.wrapped, self.validator):
+            name = getattr(self, "qualified_name", self.name)
+            cached = self._cached_validator = CachedValidator(self.validator(self.range), name=name)
+        return cached
 
     def create_widgets(self, this_node: DeclarationItem) -> Tuple[Label, LineEdit[_Value, _Converted]]:
+        from magiqt.widgets.label import Label  # pylint: disable=C0415
+
         if this_node.parent is None:
             raise ValueError(f"Cannot add to a node without parent {this_node}")
         parent: GroupBox = this_node.parent.widgets[0]  # type: ignore
         label = Label(f"{self.name}:", parent)
-        line_edit = LineEdit(self, parent)
+        line_edit = self.create_editor(parent)
+        self._apply_pending(this_node, line_edit)
+        # textChanged also covers programmatic sets and accepted completions, textEdited only user input
+        line_edit.textChanged.connect(self._stored(this_node, line_edit))
         line_edit.textEdited.connect(self._changed(parent))
         return label, line_edit
 
+    def create_editor(self, parent: Optional[QWidget] = None) -> LineEdit[_Value, _Converted]:
+        """Input widget of this field, also used for table cells"""
+        from magiqt.widgets.input.line_edit import LineEdit  # pylint: disable=C0415
+
+        return LineEdit(self, parent)
+
+    @staticmethod
+    def _apply_pending(this_node: DeclarationItem, edit: LineEdit[_Value, _Converted]) -> None:
+        if this_node.pending is not None:
+            edit.setText(this_node.pending)
+            this_node.pending = None
+
+    @staticmethod
+    def _stored(this_node: DeclarationItem, edit: IsEditable[_Converted], sync: bool = True) -> Callable[..., None]:
+        """Keep the converted value of edit in this_node so that reading the field does not parse text.
+        With sync=False this_node keeps its value until the text changes"""
+
+        def _inner(*args: Any) -> None:  # pylint: disable=W0613
+            FieldBase._assign(this_node, edit.converted())
+
+        if sync:
+            this_node.value = edit.converted()
+        return _inner
+
+    @staticmethod
+    def _assign(this_node: DeclarationItem, value: Any) -> None:
+        """Store the converted value of this_node, recorded if the form keeps a history"""
+        old, this_node.value = this_node.value, value
+        history = _history(this_node)
+        if history is not None:
+            history.record(this_node, old, value)
+        if old != value:
+            recompute_downstream(this_node)
+
     def _changed(self, parent: GroupBox) -> Callable[[str], None]:
         attr = self.attribute_name
 
@@ -46,6 +152,15 @@ class FieldBase(Declaration[_Converted], Generic[_Value, _Converted]):
 
         return _inner
 
+    def spans(self) -> Tuple[int, int]:
+        return 1, 1
+
+    def converted(self, text: str) -> Optional[_Converted]:
+        return self.cached_validator().converted(text)
+
+    def initial_value(self) -> Optional[_Converted]:
+        return self.converted("")
+
     def associated_widgets(self, instance: DeclaredContainer) -> Tuple[Label, LineEdit[_Value, _Converted]]:
         node = instance.node
         return node.children[self.attribute_name].widgets  # type: ignore
@@ -67,14 +182,82 @@ class FieldBase(Declaration[_Converted], Generic[_Value, _Converted]):
     ) -> Union[FieldBase[_Value, _Converted], Optional[_Converted]]:
         if instance is None:
             return self
-        widgets = self.associated_widgets(instance)
-        line_edit = widgets[1]
-        return line_edit.converted()
+        return instance.node.children[self.attribute_name].value  # type: ignore
 
     def __set__(self, instance: DeclaredContainer, value: Any) -> None:
-        widgets = self.associated_widgets(instance)
-        line_edit = widgets[1]
-        return line_edit.setText(str(value))
+        """Text is parsed like typed text. Other values are stored as they are, not parsed from their text,
+        and raise ValueError if they are out of range"""
+        node = instance.node.children[self.attribute_name]
+        if isinstance(value, str):
+            text, converted = value, self.converted(value)
+        else:
+            converted = self.coerced(value)
+            if converted is not None and not self.in_range(converted):
+                raise ValueError(f"{value!r} is out of the range of {self.attribute_name}")
+            text = self.text_of(converted)
+        if node.widgets:
+            node.widgets[1].setText(text)  # type: ignore
+        else:
+            node.pending = text
+        self._assign(node, converted)
+
+    def coerced(self, value: Any) -> Optional[_Converted]:
+        """value given instead of text as the type of the values of this field"""
+        return value  # type: ignore
+
+    def in_range(self, value: _Converted) -> bool:
+        return value in self.range  # type: ignore
+
+    def text_of(self, value: Optional[_Converted]) -> str:
+        """Text that converts to value"""
+        return "" if value is None else str(value)
+
+    def snapshot_value(self, this_node: DeclarationItem) -> Any:
+        """Value of this field stored by Form.snapshot"""
+        return this_node.value
+
+    def restore_value(self, this_node: DeclarationItem, value: Any) -> None:
+        """Set a value of snapshot_value without emitting widget signals. None, i.e. text that did not parse,
+        restores an empty field"""
+        if value is None or this_node.widgets:
+            self.load(this_node, "" if value is None else value)
+        else:
+            # The value was converted from this text, it is not parsed again
+            this_node.pending = self.text_of(value)
+            self._assign(this_node, value)
+
+    @staticmethod
+    def restore_values(nodes: Sequence[DeclarationItem], values: Sequence[Any]) -> None:
+        """restore_value of many fields of one form tree that do not override it"""
+        history = _history(nodes[0]) if nodes else None
+        for this_node, value in zip(nodes, values):
+            if value is None or this_node.widgets:
+                cast(FieldBase[Any, Any], this_node.declaration).restore_value(this_node, value)
+                continue
+            old, this_node.value = this_node.value, value
+            this_node.pending = localized(value) if type(value) is float else str(value)  # pylint: disable=C0123
+            if history is not None:
+                history.record(this_node, old, value)
+
+    def load(self, this_node: DeclarationItem, value: Any) -> None:
+        """Set value without emitting widget signals. Used for bulk loads that notify once afterwards.
+        Text is parsed, other values are stored as they are, also when they are out of range"""
+        if isinstance(value, str):
+            text, converted = value, None
+        else:
+            converted = self.coerced(value)
+            text = self.text_of(converted)
+        if not this_node.widgets:
+            this_node.pending = text
+            self._assign(this_node, self.converted(text) if isinstance(value, str) else converted)
+            return
+        edit: IsEditable[_Converted] = this_node.widgets[1]  # type: ignore
+        blocked = this_node.widgets[1].blockSignals(True)
+        try:
+            edit.setText(text)  # type: ignore
+        finally:
+            this_node.widgets[1].blockSignals(blocked)
+        self._assign(this_node, edit.converted() if isinstance(value, str) else converted)
 
 
 @dataclass
@@ -82,18 +265,35 @@ class StringField(FieldBase[str, str]):
     validator: Type[AnyValidator] = AnyValidator
     range: Range[str, str] = AnyRange()
 
+    def coerced(self, value: Any) -> Optional[str]:
+        return None if value is None else str(value)
+
 
 @dataclass
 class IntegerField(FieldBase[int, int]):
     validator: Type[IntValidator] = IntValidator
     range: IntRange = IntRange()
 
+    def coerced(self, value: Any) -> Optional[int]:
+        if value is None:
+            return None
+        if int(value) != value:
+            raise ValueError(f"{value!r} is not an integer")
+        return int(value)
+
 
 @dataclass
 class FloatField(FieldBase[float, float]):
     validator: Type[Validator[float, float]] = FloatValidator
     range: FloatRange = FloatRange()
 
+    def coerced(self, value: Any) -> Optional[float]:
+        return None if value is None else float(value)
+
+    def text_of(self, value: Optional[float]) -> str:
+        """Text in the decimal separator of the system locale, which FloatValidator expects"""
+        return "" if value is None else localized(value)
+
 
 @dataclass
 class DropDown(FieldBase[str, _Converted]):
@@ -101,10 +301,234 @@ class DropDown(FieldBase[str, _Converted]):
     range: ItemRange[_Converted] = ListRange(("",))  # type: ignore
 
     def create_widgets(self, this_node: DeclarationItem) -> Tuple[Label, ComboBox[str, _Converted]]:  # type: ignore
+        from magiqt.widgets.label import Label  # pylint: disable=C0415
+
         if this_node.parent is None:
             raise ValueError(f"Cannot add to a node without parent {this_node}")
         parent: GroupBox = this_node.parent.widgets[0]  # type: ignore
         label = Label(f"{self.name}:", parent)
-        combo = ComboBox(self, parent)
+        combo = self.create_editor(parent)
+        self._apply_pending(this_node, combo)  # type: ignore
+        combo.currentIndexChanged.connect(self._stored(this_node, combo))
         combo.currentIndexChanged.connect(self._changed(parent))
         return label, combo
+
+    def create_editor(self, parent: Optional[QWidget] = None) -> ComboBox[str, _Converted]:  # type: ignore
+        from magiqt.widgets.input.combo_box import ComboBox  # pylint: disable=C0415
+
+        return ComboBox(self, parent)
+
+    def snapshot_value(self, this_node: DeclarationItem) -> Optional[str]:
+        """The selected key, as items may be any objects. None if nothing was selected"""
+        if this_node.widgets:
+            row = cast("ComboBox[str, _Converted]", this_node.widgets[1]).currentIndex()
+            return None if row < 0 else self.range.display_role(row)
+        return this_node.pending
+
+    def text_of(self, value: Optional[_Converted]) -> str:
+        """Key of the item value, found with the item index of the range"""
+        if value is None:
+            return ""
+        try:
+            return self.range.display_role(self.range.row_of_item(value))
+        except ValueError:
+            return ""
+
+    def in_range(self, value: _Converted) -> bool:
+        try:
+            self.range.row_of_item(value)
+        except ValueError:
+            return False
+        return True
+
+    def restore_value(self, this_node: DeclarationItem, value: Any) -> None:
+        if value is None:
+            try:
+                value = self.range.display_role(0)
+            except IndexError:
+                return
+        self.load(this_node, value)
+
+    def initial_value(self) -> Optional[_Converted]:
+        try:
+            return self.range.item(0)
+        except IndexError:
+            return None
+
+
+@dataclass
+class QuantityField(FieldBase[float, float]):
+    """Float in one of the units of quantity, chosen next to the input. The value is always in the base unit,
+    the first of quantity, and only the text is converted. Switching units renders the value again
+    without parsing the text, so it does not drift. range is in the base unit"""
+
+    validator: Type[UnitValidator] = UnitValidator
+    range: FloatRange = FloatRange()
+    quantity: QuantityType[float] = Unitless
+    # Unit shown initially, the base unit if empty
+    unit: str = ""
+    # Significant digits of the shown text
+    precision: int = 12
+    _unit_validators: Dict[str, CachedValidator[float, float]] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self) -> None:
+        self.unit = self.quantity[self.unit or self.base_unit].name
+
+    @property
+    def base_unit(self) -> str:
+        return self.quantity.units[0].name
+
+    def cached_validator(self, unit: Optional[str] = None) -> CachedValidator[float, float]:
+        """Validator of text in unit, the base unit by default, converting to the base unit"""
+        if unit is None or unit == self.base_unit:
+            return super().cached_validator()
+        cached = self._unit_validators.get(unit)
+        if cached is None or cached.wrapped.range is not self.range:
+            validator = UnitValidator(self.range, self.quantity.converter(unit, self.base_unit))
+            name = f"{getattr(self, 'qualified_name', self.name)}[{unit}]"
+            cached = self._unit_validators[unit] = CachedValidator(validator, name=name)
+        return cached
+
+    def display_text(self, value: Optional[float], unit: str) -> str:
+        """value in the base unit as text in unit"""
+        if value is None:
+            return ""
+        return localized(self.quantity.converter(self.base_unit, unit)(value), self.precision)
+
+    def create_widgets(  # type: ignore
+        self, this_node: DeclarationItem
+    ) -> Tuple[Label, LineEdit[float, float], UnitBox]:
+        from magiqt.widgets.label import Label  # pylint: disable=C0415
+        from magiqt.widgets.unit_box import UnitBox  # pylint: disable=C0415
+
+        if this_node.parent is None:
+            raise ValueError(f"Cannot add to a node without parent {this_node}")
+        parent: GroupBox = this_node.parent.widgets[0]  # type: ignore
+        label = Label(f"{self.name}:", parent)
+        line_edit = self.create_editor(parent)
+        units = UnitBox(parent)
+        units.addItems([unit.name for unit in self.quantity.units])
+        units.setCurrentText(self.unit)
+        this_node.pending = None
+        self._use_unit(line_edit, self.unit)
+        self._show(this_node.value, line_edit, self.unit)
+        line_edit.textChanged.connect(self._stored(this_node, line_edit, sync=False))
+        line_edit.textEdited.connect(self._changed(parent))
+        units.currentTextChanged.connect(self._unit_changed(this_node, line_edit))
+        return label, line_edit, units
+
+    def _use_unit(self, line_edit: LineEdit[float, float], unit: str) -> None:
+        # The wrapper LineEdit created is reused, a new one per switch would live as long as the widget
+        line_edit.validator().wrapped = self.cached_validator(unit)
+
+    def _show(self, value: Optional[float], line_edit: LineEdit[float, float], unit: str) -> None:
+        """Text of value in unit, without signals as the value does not change"""
+        blocked = line_edit.blockSignals(True)
+        try:
+            line_edit.setText(self.display_text(value, unit))
+        finally:
+            line_edit.blockSignals(blocked)
+
+    def _unit_changed(self, this_node: DeclarationItem, line_edit: LineEdit[float, float]) -> Callable[[str], None]:
+        def _inner(unit: str) -> None:
+            self._use_unit(line_edit, unit)
+            self._show(this_node.value, line_edit, unit)
+
+        return _inner
+
+    def spans(self) -> Tuple[int, int, int]:  # type: ignore
+        return 1, 1, 1
+
+    def __set__(self, instance: DeclaredContainer, value: Any) -> None:
+        """Text or a number in the base unit, numbers out of range raise ValueError"""
+        if not isinstance(value, str) and value is not None and not self.in_range(float(value)):
+            raise ValueError(f"{value!r} is out of the range of {self.attribute_name}")
+        self.load(instance.node.children[self.attribute_name], value)
+
+    def coerced(self, value: Any) -> Optional[float]:
+        return None if value is None else float(value)
+
+    def text_of(self, value: Optional[float]) -> str:
+        return "" if value is None else localized(value)
+
+    def load(self, this_node: DeclarationItem, value: Any) -> None:
+        """Set value in the base unit, also as text. Only text is parsed"""
+        converted = self.converted(value) if isinstance(value, str) else self.coerced(value)
+        this_node.pending = None
+        self._assign(this_node, converted)
+        if this_node.widgets:
+            units: UnitBox = this_node.widgets[2]  # type: ignore
+            self._show(converted, this_node.widgets[1], units.currentText())  # type: ignore
+
+
+@dataclass
+class ComputedField(FieldBase[str, Any]):
+    """Read-only field with the value of function called with the values of inputs, names of fields of the
+    form or dotted paths into its sub-forms, also of other computed fields. Recomputed when an input changes.
+    The value is None while an input is None or function raises ArithmeticError or ValueError"""
+
+    validator: Type[AnyValidator] = AnyValidator
+    range: Range[str, str] = AnyRange()
+    read_only: bool = True
+    inputs: Tuple[str, ...] = ()
+    function: Optional[Callable[..., Any]] = None
+    paths: Tuple[Tuple[str, ...], ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        if not self.inputs or self.function is None:
+            raise ValueError(f"Computed field {self.name} needs inputs and a function")
+        self.inputs = tuple(self.inputs)
+        self.paths = tuple(tuple(path.split(".")) for path in self.inputs)
+
+    def compute(self, this_node: DeclarationItem) -> bool:
+        """Update the value from the inputs. Returns True if it changed"""
+        container = cast(DeclarationItem, this_node.parent)
+        values = []
+        for path in self.paths:
+            node = container
+            for key in path:
+                node = node.children[key]
+            values.append(node.value)
+        inputs = tuple(values)
+        if inputs == this_node.memo and this_node.memo is not None:
+            return False
+        this_node.memo = inputs
+        value = None
+        if None not in inputs:
+            try:
+                value = cast(Callable[..., Any], self.function)(*inputs)
+            except (ArithmeticError, ValueError):
+                value = None
+        if value == this_node.value:
+            return False
+        this_node.value = value
+        if this_node.widgets:
+            this_node.widgets[1].setText(self.text_of(value))  # type: ignore
+        return True
+
+    def create_widgets(self, this_node: DeclarationItem) -> Tuple[Label, LineEdit[str, Any]]:
+        from magiqt.widgets.label import Label  # pylint: disable=C0415
+
+        if this_node.parent is None:
+            raise ValueError(f"Cannot add to a node without parent {this_node}")
+        parent: GroupBox = this_node.parent.widgets[0]  # type: ignore
+        line_edit = self.create_editor(parent)
+        line_edit.setText(self.text_of(this_node.value))
+        return Label(f"{self.name}:", parent), line_edit
+
+    def initial_value(self) -> Any:
+        return None
+
+    def __set__(self, instance: DeclaredContainer, value: Any) -> None:
+        raise ValueError(f"Computed field {self.name} cannot be set")
+
+    def load(self, this_node: DeclarationItem, value: Any) -> None:
+        """Ignored, the value follows the inputs. Lets as_dict results load back with set_from_dict"""
+
+    def snapshot_value(self, this_node: DeclarationItem) -> None:
+        return None
+
+    def restore_value(self, this_node: DeclarationItem, value: Any) -> None:
+        pass
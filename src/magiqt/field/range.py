@@ -1,7 +1,11 @@
-from dataclasses import dataclass
-from typing import Sequence, Dict, Generic
+from __future__ import annotations
+from dataclasses import dataclass, field
+from itertools import islice
+from weakref import WeakMethod
+from typing import Sequence, Dict, Generic, Optional, Tuple, Callable, Iterable, List, Union, Any, cast
 
 from magiqt.interface import Range, _Converted
+from magiqt.optional import numpy
 
 
 class AnyRange(Range[str, str]):
@@ -39,10 +43,13 @@ class FloatRange(Range[float, float]):
             return True
         if self.low_inclusive and item == self.low:
             return True
-        if self.high_inclusive and item == self.high_inclusive:
+        if self.high_inclusive and item == self.high:
             return True
         return False
 
+    def contains_many(self, items: Sequence[float]) -> Sequence[bool]:
+        return _in_bounds(self, items)
+
 
 @dataclass
 class IntRange(Range[int, int]):
@@ -65,10 +72,27 @@ class IntRange(Range[int, int]):
             return True
         if self.low_inclusive and item == self.low:
             return True
-        if self.high_inclusive and item == self.high_inclusive:
+        if self.high_inclusive and item == self.high:
             return True
         return False
 
+    def contains_many(self, items: Sequence[int]) -> Sequence[bool]:
+        return _in_bounds(self, items)
+
+
+def _in_bounds(range_: Union[FloatRange, IntRange], items: Sequence[Any]) -> Sequence[bool]:
+    """Vectorized __contains__ of FloatRange and IntRange"""
+    np = numpy()
+    if np is None:
+        return [item in range_ for item in items]
+    values = np.asarray(items)
+    inside = (range_.low < values) & (values < range_.high)
+    if range_.low_inclusive:
+        inside |= values == range_.low
+    if range_.high_inclusive:
+        inside |= values == range_.high
+    return cast(Sequence[bool], inside)
+
 
 class ItemRange(Range[str, _Converted], Generic[_Converted]):
     def __contains__(self, item: str) -> bool:
@@ -92,16 +116,125 @@ class ItemRange(Range[str, _Converted], Generic[_Converted]):
     def item(self, index: int) -> _Converted:
         raise NotImplementedError
 
+    def index_of(self, item: str) -> int:
+        raise NotImplementedError
+
+    def row_of_item(self, item: Any) -> int:
+        """Row of the first item equal to item, the reverse of self.item. Raises ValueError if there is none"""
+        for row in range(len(self)):
+            if self.item(row) == item:
+                return row
+        raise ValueError(f"{item!r} is not in range")
+
+    def can_fetch_more(self) -> bool:
+        return False
+
+    def fetch_more(self) -> int:
+        """Load the next chunk of items. Returns the number of items added"""
+        return 0
+
+    def on_fetch(self, callback: Callable[[], None]) -> None:
+        """Call the bound method callback after items are loaded, for as long as its object is alive"""
+
+
+@dataclass
+class IndexedRange(ItemRange[_Converted]):
+    """Tuple backed items with a lazily built key -> row index. reverse_index=False trades lookups for memory"""
+
+    _keys: Sequence[str]
+    _values: Optional[Sequence[_Converted]] = None
+    reverse_index: bool = True
+    _rows: Optional[Dict[str, int]] = field(default=None, init=False, repr=False, compare=False)
+    _item_rows: Optional[Dict[Any, int]] = field(default=None, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._keys = tuple(self._keys)
+        if self._values is not None:
+            self._values = tuple(self._values)
+            if len(self._values) != len(self._keys):
+                raise ValueError("Keys and values must have the same length")
+
+    def _row_index(self) -> Dict[str, int]:
+        if self._rows is None:
+            keys: Tuple[str, ...] = self._keys  # type: ignore
+            # Iterating backwards keeps the row of the first occurrence of duplicated keys
+            self._rows = dict(zip(reversed(keys), range(len(keys) - 1, -1, -1)))
+        return self._rows
+
+    def __contains__(self, item: str) -> bool:
+        if self.reverse_index:
+            return item in self._row_index()
+        return item in self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def to_range_item(self, item: str) -> _Converted:
+        return self.item(self.index_of(item))
+
+    def is_mapping(self) -> bool:
+        return True
+
+    def gui_items(self) -> Sequence[str]:
+        return self._keys
+
+    def display_role(self, index: int) -> str:
+        return self._keys[index]
+
+    def item(self, index: int) -> _Converted:
+        if self._values is None:
+            return self._keys[index]  # type: ignore
+        return self._values[index]
+
+    def index_of(self, item: str) -> int:
+        if not self.reverse_index:
+            return self._keys.index(item)
+        try:
+            return self._row_index()[item]
+        except KeyError:
+            raise ValueError(f"{item!r} is not in range") from None
+
+    def row_of_item(self, item: Any) -> int:
+        """Indexed like the keys, items that are not hashable are searched"""
+        if self._values is None:
+            if not isinstance(item, str):
+                raise ValueError(f"{item!r} is not in range")
+            return self.index_of(item)
+        if not self.reverse_index:
+            return super().row_of_item(item)
+        if self._item_rows is None:
+            try:
+                values: Tuple[Any, ...] = self._values  # type: ignore
+                self._item_rows = dict(zip(reversed(values), range(len(values) - 1, -1, -1)))
+            except TypeError:
+                # Searched instead
+                self._item_rows = {}
+        if not self._item_rows:
+            return super().row_of_item(item)
+        try:
+            return self._item_rows[item]
+        except KeyError:
+            raise ValueError(f"{item!r} is not in range") from None
+        except TypeError:
+            return super().row_of_item(item)
+
 
 @dataclass
 class ListRange(ItemRange[str]):
+    """Items are copied to a tuple, later changes to the given sequence do not change the range"""
+
     _items: Sequence[str]
+    _indexed: IndexedRange[str] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._items = tuple(self._items)
+        self._indexed = IndexedRange(self._items)
 
     def __contains__(self, item: str) -> bool:
-        return item in self._items
+        return item in self._indexed
 
     def __len__(self) -> int:
-        return len(self._items)
+        return len(self._indexed)
 
     def to_range_item(self, item: str) -> str:
         return item
@@ -110,18 +243,31 @@ class ListRange(ItemRange[str]):
         return True
 
     def gui_items(self) -> Sequence[str]:
-        return self._items
+        return self._indexed.gui_items()
 
     def display_role(self, index: int) -> str:
-        return self._items[index]
+        return self._indexed.display_role(index)
 
     def item(self, index: int) -> str:
         return self.display_role(index)
 
+    def index_of(self, item: str) -> int:
+        return self._indexed.index_of(item)
+
+    def row_of_item(self, item: Any) -> int:
+        return self._indexed.row_of_item(item)
+
 
 @dataclass
 class MappedRange(ItemRange[_Converted]):
+    """Items are copied, later changes to the given dict do not change the range"""
+
     _items: Dict[str, _Converted]
+    _indexed: IndexedRange[_Converted] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        self._items = dict(self._items)
+        self._indexed = IndexedRange(tuple(self._items.keys()), tuple(self._items.values()))
 
     def __contains__(self, item: str) -> bool:
         return item in self._items
@@ -136,14 +282,121 @@ class MappedRange(ItemRange[_Converted]):
         return True
 
     def gui_items(self) -> Sequence[str]:
-        return list(self._items.keys())
-
-    def _get_key(self, index: int) -> str:
-        listed = list(self._items.keys())
-        return listed[index]
+        return self._indexed.gui_items()
 
     def display_role(self, index: int) -> str:
-        return self._get_key(index)
+        return self._indexed.display_role(index)
 
     def item(self, index: int) -> _Converted:
-        return self._items[self._get_key(index)]
+        return self._indexed.item(index)
+
+    def index_of(self, item: str) -> int:
+        return self._indexed.index_of(item)
+
+    def row_of_item(self, item: Any) -> int:
+        return self._indexed.row_of_item(item)
+
+
+@dataclass
+class LazyRange(ItemRange[str]):  # pylint: disable=R0902
+    """Items loaded in pages on demand. ``_pages(offset, limit)`` returns at most ``limit`` items, fewer at the end.
+
+    ``lookup`` answers membership from the source. Without it, membership checks load at most ``scan_limit`` items,
+    so sources with more items than that need a lookup for their later items to be valid.
+    """
+
+    _pages: Callable[[int, int], Sequence[str]]
+    page_size: int = 256
+    lookup: Optional[Callable[[str], bool]] = None
+    scan_limit: int = 4096
+    _keys: List[str] = field(default_factory=list, init=False, repr=False, compare=False)
+    _rows: Dict[str, int] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _exhausted: bool = field(default=False, init=False, repr=False, compare=False)
+    _on_fetch: List[WeakMethod[Callable[[], None]]] = field(default_factory=list, init=False, repr=False, compare=False)
+
+    @classmethod
+    def from_iterable(cls, items: Iterable[str], page_size: int = 256) -> LazyRange:
+        iterator = iter(items)
+
+        def pages(offset: int, limit: int) -> Sequence[str]:  # pylint: disable=W0613
+            return list(islice(iterator, limit))
+
+        return cls(pages, page_size)
+
+    @classmethod
+    def from_loader(
+        cls,
+        loader: Callable[[int, int], Sequence[str]],
+        page_size: int = 256,
+        lookup: Optional[Callable[[str], bool]] = None,
+        scan_limit: int = 4096,
+    ) -> LazyRange:
+        return cls(loader, page_size, lookup, scan_limit)
+
+    def on_fetch(self, callback: Callable[[], None]) -> None:
+        self._on_fetch.append(WeakMethod(callback))
+
+    def can_fetch_more(self) -> bool:
+        return not self._exhausted
+
+    def fetch_more(self) -> int:
+        if self._exhausted:
+            return 0
+        page = self._pages(len(self._keys), self.page_size)
+        if len(page) < self.page_size:
+            self._exhausted = True
+        rows = self._rows
+        for row, key in enumerate(page, len(self._keys)):
+            rows.setdefault(key, row)
+        self._keys.extend(page)
+        if page:
+            for callback in self._on_fetch:
+                method = callback()
+                if method is not None:
+                    method()
+            self._on_fetch = [callback for callback in self._on_fetch if callback() is not None]
+        return len(page)
+
+    def _fetch_until(self, found: Callable[[], bool]) -> bool:
+        while not found():
+            if not self.fetch_more():
+                return False
+        return True
+
+    def __contains__(self, item: str) -> bool:
+        if item in self._rows:
+            return True
+        if self.lookup is not None:
+            return self.lookup(item)
+        self._fetch_until(lambda: item in self._rows or len(self._keys) >= self.scan_limit)
+        return item in self._rows
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def to_range_item(self, item: str) -> str:
+        return item
+
+    def is_mapping(self) -> bool:
+        return True
+
+    def gui_items(self) -> Sequence[str]:
+        return self._keys
+
+    def display_role(self, index: int) -> str:
+        if index >= len(self._keys):
+            self._fetch_until(lambda: index < len(self._keys))
+        return self._keys[index]
+
+    def item(self, index: int) -> str:
+        return self.display_role(index)
+
+    def index_of(self, item: str) -> int:
+        if item not in self or not self._fetch_until(lambda: item in self._rows):
+            raise ValueError(f"{item!r} is not in range")
+        return self._rows[item]
+
+    def row_of_item(self, item: Any) -> int:
+        if not isinstance(item, str):
+            raise ValueError(f"{item!r} is not in range")
+        return self.index_of(item)
@@ -1,13 +1,64 @@
 import locale
-from typing import Optional
+from typing import Optional, Sequence, Callable, Any, List, Tuple, Generic, Dict, cast
 
+from magiqt import profiling
 from magiqt.field.range import ItemRange
-from magiqt.interface import Validator, _Converted, _Value
+from magiqt.interface import Validator, _Converted, _Value, BatchResult, Range, ValidatorResult
+from magiqt.optional import numpy
 
 SYSTEM_SEPARATOR = str(locale.localeconv()["decimal_point"])
 INVALID_SEPARATOR = "," if SYSTEM_SEPARATOR == "." else "."
 
 
+def _parsed(values: Sequence[str], parse: Callable[[str], Any]) -> List[Any]:
+    """parse of each value, None where it raises ValueError"""
+    converted: List[Any] = []
+    append = converted.append
+    for text in values:
+        if not text:  # Empty cells are common and raising is slow
+            append(None)
+            continue
+        try:
+            append(parse(text))
+        except ValueError:
+            append(None)
+    return converted
+
+
+def localized(value: float, digits: Optional[int] = None) -> str:
+    """Text of value with the system decimal separator, as FloatValidator expects. Without digits the shortest
+    text that parses back to value exactly, else rounded to that many significant digits"""
+    text = repr(float(value)) if digits is None else format(value, f".{digits}g")
+    if text.endswith(".0"):
+        return text[:-2]
+    return text.replace(".", SYSTEM_SEPARATOR)
+
+
+def _localized_float(text: str) -> float:
+    if INVALID_SEPARATOR in text:
+        raise ValueError(text)
+    return float(text.replace(SYSTEM_SEPARATOR, "."))
+
+
+def _batch_result(converted: List[Any], dtype: Any, range_: Range[Any, Any]) -> BatchResult[Any]:
+    """Range check and states of parsed values, as arrays when NumPy is installed"""
+    valid, intermediate = ValidatorResult.State.VALID.value, ValidatorResult.State.INTERMEDIATE.value
+    np = numpy()
+    if np is None:
+        in_range = [value is not None and value in range_ for value in converted]
+        return BatchResult(converted, [valid if inside else intermediate for inside in in_range], in_range)
+    parsed = np.fromiter((value is not None for value in converted), bool, len(converted))
+    filled = [0 if value is None else value for value in converted]
+    try:
+        values = np.array(filled, dtype=dtype)
+    except OverflowError:  # Integers beyond 64 bits
+        values = np.array(filled, dtype=object)
+    in_range = parsed & np.asarray(range_.contains_many(cast(Sequence[Any], values)), dtype=np.bool_)
+    states = np.where(in_range, np.int8(valid), np.int8(intermediate))
+    masked = np.ma.MaskedArray(values, mask=~parsed)
+    return BatchResult(cast(Sequence[Any], masked), cast(Sequence[int], states), cast(Sequence[bool], in_range))
+
+
 class AnyValidator(Validator[str, str]):
     def mapped_to_range(self, value: str) -> str:
         return value
@@ -15,6 +66,11 @@ class AnyValidator(Validator[str, str]):
     def validated(self, value: str) -> Optional[str]:
         return value
 
+    def validate_many(self, values: Sequence[str]) -> BatchResult[str]:
+        in_range = self.range.contains_many(values)
+        valid, intermediate = ValidatorResult.State.VALID.value, ValidatorResult.State.INTERMEDIATE.value
+        return BatchResult(list(values), [valid if inside else intermediate for inside in in_range], in_range)
+
 
 class FloatValidator(Validator[float, float]):
     def validated(self, value: str) -> Optional[float]:
@@ -30,6 +86,30 @@ class FloatValidator(Validator[float, float]):
     def mapped_to_range(self, value: float) -> float:
         return value
 
+    def validate_many(self, values: Sequence[str]) -> BatchResult[float]:
+        # float and int reject "," themselves, so only other separators need checks
+        converted = _parsed(values, float if SYSTEM_SEPARATOR == "." else _localized_float)
+        return _batch_result(converted, float, self.range)
+
+
+class UnitValidator(FloatValidator):
+    """FloatValidator for text in a unit, validated and converted to base units by to_base"""
+
+    def __init__(self, range_: Range[float, float], to_base: Optional[Callable[[float], float]] = None) -> None:
+        super().__init__(range_)
+        self.to_base = to_base
+
+    def validated(self, value: str) -> Optional[float]:
+        parsed = super().validated(value)
+        if parsed is None or self.to_base is None:
+            return parsed
+        return self.to_base(parsed)
+
+    def validate_many(self, values: Sequence[str]) -> BatchResult[float]:
+        if self.to_base is None:
+            return super().validate_many(values)
+        return Validator.validate_many(self, values)
+
 
 class IntValidator(Validator[int, int]):
     def validated(self, value: str) -> Optional[int]:
@@ -44,6 +124,10 @@ class IntValidator(Validator[int, int]):
     def mapped_to_range(self, value: int) -> int:
         return value
 
+    def validate_many(self, values: Sequence[str]) -> BatchResult[int]:
+        converted = _parsed(values, int)
+        return _batch_result(converted, "int64", self.range)
+
 
 class ItemRangeValidator(Validator[str, _Converted]):
     range: ItemRange[_Converted]
@@ -55,3 +139,107 @@ class ItemRangeValidator(Validator[str, _Converted]):
 
     def mapped_to_range(self, value: str) -> _Converted:
         return self.range.to_range_item(value)
+
+
+class CachedValidator(Validator[_Value, _Converted], Generic[_Value, _Converted]):  # pylint: disable=R0902
+    """LRU memo of validate and converted per text around another validator. Qt validates the same text
+    several times per keystroke and the widget converts it once more. Cleared when the range is replaced"""
+
+    def __init__(  # pylint: disable=W0231
+        self, wrapped: Validator[_Value, _Converted], maxsize: int = 256, name: str = ""
+    ) -> None:
+        self.wrapped = wrapped
+        # Reported by magiqt.profiling
+        self.name = name or type(wrapped).__name__
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        # Dicts keep insertion order, a hit is moved to the end and the first entry is the least recently used
+        self._cache: Dict[str, Tuple[ValidatorResult[_Value], Optional[_Converted]]] = {}
+        self._range = wrapped.range
+        # Custom validate or converted cannot share the single parse below
+        self._shared_parse = (
+            type(wrapped).validate is Validator.validate and type(wrapped).converted is Validator.converted
+        )
+
+    @property  # type: ignore
+    def range(self) -> Range[_Value, _Converted]:
+        return self.wrapped.range
+
+    @range.setter
+    def range(self, range_: Range[_Value, _Converted]) -> None:
+        self.wrapped.range = range_
+
+    def invalidate(self) -> None:
+        """Forget cached results, e.g. after changing the range in place"""
+        self._cache.clear()
+        self._range = self.wrapped.range
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def validated(self, value: str) -> Optional[_Value]:
+        return self.wrapped.validated(value)
+
+    def mapped_to_range(self, value: _Value) -> _Converted:
+        return self.wrapped.mapped_to_range(value)
+
+    def validate(self, value: str) -> ValidatorResult[_Value]:
+        return self._lookup(value)[0]
+
+    def converted(self, value: str) -> Optional[_Converted]:
+        return self._lookup(value)[1]
+
+    def validate_many(self, values: Sequence[str]) -> BatchResult[_Converted]:
+        return self.wrapped.validate_many(values)
+
+    def _lookup(self, value: str) -> Tuple[ValidatorResult[_Value], Optional[_Converted]]:
+        if self.wrapped.range is not self._range:
+            self.invalidate()
+        cache = self._cache
+        entry = cache.pop(value, None)
+        if entry is not None:
+            self.hits += 1
+            if profiling.PROFILER.enabled:
+                profiling.PROFILER.count("validation_hit", self.name)
+        else:
+            self.misses += 1
+            if profiling.PROFILER.enabled:
+                entry = self._computed_profiled(value)
+            else:
+                entry = self._computed(value)
+            if len(cache) >= self.maxsize:
+                del cache[next(iter(cache))]
+        cache[value] = entry
+        return entry
+
+    def _computed(self, value: str) -> Tuple[ValidatorResult[_Value], Optional[_Converted]]:
+        wrapped = self.wrapped
+        if not self._shared_parse:
+            return wrapped.validate(value), wrapped.converted(value)
+        validated = wrapped.validated(value)
+        if validated is None:
+            return ValidatorResult(None, value, ValidatorResult.State.INTERMEDIATE), None
+        converted = wrapped.mapped_to_range(validated)
+        if validated not in wrapped.range:
+            return ValidatorResult(None, value, ValidatorResult.State.INTERMEDIATE), converted
+        return ValidatorResult(validated, value), converted
+
+    def _computed_profiled(self, value: str) -> Tuple[ValidatorResult[_Value], Optional[_Converted]]:
+        """_computed with validation and conversion timed separately"""
+        wrapped = self.wrapped
+        if not self._shared_parse:
+            with profiling.span("validation", self.name):
+                result = wrapped.validate(value)
+            with profiling.span("conversion", self.name):
+                return result, wrapped.converted(value)
+        with profiling.span("validation", self.name):
+            validated = wrapped.validated(value)
+            inside = validated is not None and validated in wrapped.range
+        if validated is None:
+            return ValidatorResult(None, value, ValidatorResult.State.INTERMEDIATE), None
+        with profiling.span("conversion", self.name):
+            converted = wrapped.mapped_to_range(validated)
+        if not inside:
+            return ValidatorResult(None, value, ValidatorResult.State.INTERMEDIATE), converted
+        return ValidatorResult(validated, value), converted
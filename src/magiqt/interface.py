@@ -12,9 +12,13 @@ from typing import (
     Union,
     overload,
     Any,
+    FrozenSet,
+    List,
+    TYPE_CHECKING,
 )
 
-from PyQt5.QtWidgets import QWidget, QLayout
+if TYPE_CHECKING:
+    from PyQt5.QtWidgets import QWidget, QLayout
 
 _Value = TypeVar("_Value")
 _Converted = TypeVar("_Converted")
@@ -46,6 +50,17 @@ class ValidatorResult(Generic[_Converted]):
         return self.converted
 
 
+@dataclass
+class BatchResult(Generic[_Converted]):
+    """Result of Validator.validate_many. The sequences are NumPy arrays when NumPy is installed"""
+
+    # Parsed values, also those out of range. A masked array with NumPy, None where parsing failed without
+    converted: Sequence[Optional[_Converted]]
+    # ValidatorResult.State values
+    states: Sequence[int]
+    in_range: Sequence[bool]
+
+
 @dataclass(init=False)  # type: ignore
 class Validator(Generic[_Value, _Converted], metaclass=AbstractWithClassRepr):
     range_: Range[_Value, _Converted]
@@ -75,6 +90,19 @@ class Validator(Generic[_Value, _Converted], metaclass=AbstractWithClassRepr):
             return ValidatorResult(None, value, ValidatorResult.State.INTERMEDIATE)
         return ValidatorResult(validated, value)
 
+    def validate_many(self, values: Sequence[str]) -> BatchResult[_Converted]:
+        """validate for many values at once, e.g. for imports. Subclasses may override with vectorized versions"""
+        converted: List[Optional[_Converted]] = []
+        states: List[int] = []
+        in_range: List[bool] = []
+        for value in values:
+            validated = self.validated(value)
+            inside = validated is not None and validated in self.range
+            converted.append(None if validated is None else self.mapped_to_range(validated))
+            states.append((ValidatorResult.State.VALID if inside else ValidatorResult.State.INTERMEDIATE).value)
+            in_range.append(inside)
+        return BatchResult(converted, states, in_range)
+
 
 @dataclass  # type: ignore
 class Range(Generic[_Value, _Converted]):
@@ -94,6 +122,10 @@ class Range(Generic[_Value, _Converted]):
     def gui_items(self) -> Sequence[str]:
         pass
 
+    def contains_many(self, items: Sequence[_Value]) -> Sequence[bool]:
+        """Membership of each item. Subclasses may override with vectorized versions"""
+        return [item in self for item in items]
+
 
 class Declaration(ABC, Generic[_ReturnType]):
     attribute_name: str
@@ -125,6 +157,14 @@ class Declaration(ABC, Generic[_ReturnType]):
     def create_widgets(self, this_node: DeclarationItem) -> Sequence[QWidget]:
         pass
 
+    def spans(self) -> Sequence[int]:
+        """Grid columns taken by each widget of create_widgets"""
+        raise NotImplementedError
+
+    def initial_value(self) -> Optional[_ReturnType]:
+        """Value of a node whose widgets have not been created yet"""
+        return None
+
     def associated_widgets(self, instance: DeclaredContainer) -> Sequence[QWidget]:
         pass
 
@@ -132,18 +172,22 @@ class Declaration(ABC, Generic[_ReturnType]):
 class DeclaredContainer(Declaration["DeclaredContainer"], ABC):
     node: DeclarationItem
 
-    def _on_change(self, attr: str, this_item: DeclarationItem) -> None:
+    def on_change_batch(self, attrs: FrozenSet[str], this_item: DeclarationItem) -> bool:  # pylint: disable=W0613
+        """Hook with the names of all children changed since the last delivery. Return True to propagate.
+        Runs the single change hooks by default"""
+        return self._handle_change(self.attribute_name, this_item)
+
+    def _handle_change(self, attr: str, this_item: DeclarationItem) -> bool:
+        """Run the change hooks. Returns True if the change propagates to the parent"""
         if not self.on_change_pre_validate(attr, this_item):
-            return None
+            return False
         if not self.is_valid(this_item):
-            return None
-        if self.on_change(attr, this_item):
-            parent = this_item.parent
-            if parent is None:
-                return None
-            widget = parent.widgets[0]
-            widget.changed.emit(attr)
-        return None
+            return False
+        return self._propagates(self.on_change(attr, this_item), this_item)
+
+    def _propagates(self, changed: Any, this_item: DeclarationItem) -> bool:  # pylint: disable=W0613
+        """Whether the result of on_change propagates the change"""
+        return bool(changed)
 
     def widget(self) -> QWidget:
         raise NotImplementedError
@@ -174,12 +218,35 @@ class IsEditable(Generic[_Converted], IsPlaceable):
 
 
 @dataclass
-class DeclarationItem:
+class DeclarationItem:  # pylint: disable=R0902
     declaration: Declaration[Any]
     widgets: Sequence[QWidget] = tuple()
     parent: Optional[DeclarationItem] = None
     children: Dict[str, DeclarationItem] = field(default_factory=dict)
+    value: Any = None
+    # Text set while the widgets did not exist yet, applied when they are created
+    pending: Optional[str] = None
+    # Container whose child widgets are created on first expand or materialize()
+    lazy: bool = False
+    # Inputs of the value of a computed field, it is recomputed only when they change
+    memo: Any = field(default=None, repr=False)
+    # Optional[DeclaredContainer], but mypy would treat a class level default of a descriptor type as a descriptor
+    handle: Any = field(default=None, repr=False)
 
     def add_child(self, attribute: str, item: DeclarationItem) -> None:
         item.parent = self
         self.children[attribute] = item
+
+    def root(self) -> DeclarationItem:
+        node = self
+        while node.parent is not None:
+            node = node.parent
+        return node
+
+    def depth(self) -> int:
+        depth = 0
+        parent = self.parent
+        while parent is not None:
+            depth += 1
+            parent = parent.parent
+        return depth
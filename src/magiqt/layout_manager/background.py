@@ -0,0 +1,124 @@
+from __future__ import annotations
+import asyncio
+import sys
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Union
+
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtBoundSignal
+from PyQt5.QtWidgets import QApplication
+
+from magiqt.application import Application
+from magiqt.interface import DeclarationItem
+from magiqt.layout_manager.frozen import FrozenForm
+
+
+_EXECUTORS: Dict[str, Executor] = {}
+
+
+def executor(kind: Union[str, Executor]) -> Executor:
+    """Shared executor for kind "thread" or "process". Executor instances are used as they are"""
+    if isinstance(kind, Executor):
+        return kind
+    if kind not in _EXECUTORS:
+        if kind == "thread":
+            _EXECUTORS[kind] = ThreadPoolExecutor(thread_name_prefix="magiqt-background")
+        elif kind == "process":
+            _EXECUTORS[kind] = ProcessPoolExecutor()
+        else:
+            raise ValueError(f"Unknown executor {kind!r}, use 'thread', 'process' or an Executor")
+    return _EXECUTORS[kind]
+
+
+class BackgroundRunner(QObject):
+    """Runs a function per container off the GUI thread and hands the result of the latest run back to it"""
+
+    finished: Union[pyqtSignal, pyqtBoundSignal] = pyqtSignal(object, int, object)
+
+    def __init__(self, parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self._runs: Dict[int, Tuple[int, Future[Any]]] = {}
+        self._generation = 0
+        self.finished.connect(self._deliver)
+
+    def submit(
+        self,
+        this_item: DeclarationItem,
+        function: Callable[[FrozenForm], Any],
+        values: FrozenForm,
+        kind: Union[str, Executor] = "thread",
+    ) -> None:
+        previous = self._runs.get(id(this_item))
+        if previous is not None:
+            previous[1].cancel()
+        self._generation += 1
+        generation = self._generation
+        future = executor(kind).submit(function, values)
+        self._runs[id(this_item)] = (generation, future)
+        future.add_done_callback(lambda done: self._finished(this_item, generation, done))
+
+    def running(self, this_item: DeclarationItem) -> bool:
+        return id(this_item) in self._runs
+
+    def _finished(self, this_item: DeclarationItem, generation: int, future: Future[Any]) -> None:
+        if future.cancelled():
+            return
+        try:
+            self.finished.emit(this_item, generation, future)
+        except RuntimeError:  # The application is shutting down
+            pass
+
+    def _deliver(self, this_item: DeclarationItem, generation: int, future: Future[Any]) -> None:
+        current = self._runs.get(id(this_item))
+        if current is None or current[0] != generation:
+            return
+        del self._runs[id(this_item)]
+        error = future.exception()
+        if error is not None:
+            sys.excepthook(type(error), error, error.__traceback__)
+            return
+        declaration: Any = this_item.declaration
+        declaration.on_background_result(future.result(), this_item)
+
+
+_RUNNER: Optional[BackgroundRunner] = None
+
+
+def runner() -> BackgroundRunner:
+    global _RUNNER  # pylint: disable=W0603
+    if _RUNNER is None:
+        _RUNNER = BackgroundRunner()
+    return _RUNNER
+
+
+_TASKS: Dict[int, asyncio.Task[Any]] = {}
+
+
+def run_task(this_item: DeclarationItem, awaitable: Awaitable[Any], done: Callable[[Any], None]) -> asyncio.Task[Any]:
+    """Run awaitable on the loop of the Application, cancelling the task still running for this_item.
+    done is called with the result unless the task was cancelled or failed"""
+    app = QApplication.instance()
+    if not isinstance(app, Application):
+        raise ValueError("Coroutine hooks need magiqt.application.Application")
+    previous = _TASKS.get(id(this_item))
+    if previous is not None:
+        previous.cancel()
+
+    async def _wrapped() -> Any:
+        return await awaitable
+
+    task = app.create_task(_wrapped())
+    _TASKS[id(this_item)] = task
+
+    def _finished(finished: asyncio.Task[Any]) -> None:
+        if _TASKS.get(id(this_item)) is finished:
+            del _TASKS[id(this_item)]
+        if finished.cancelled():
+            return
+        error = finished.exception()
+        if error is not None:
+            sys.excepthook(type(error), error, error.__traceback__)
+            return
+        done(finished.result())
+
+    task.add_done_callback(_finished)
+    return task
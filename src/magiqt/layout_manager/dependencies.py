@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Tuple, Type, cast
+
+from magiqt.field.fields import ComputedField
+from magiqt.interface import DeclaredContainer
+
+Path = Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class DependencyGraph:
+    """Computed fields of a form class in topological order, and for each input path the computed fields
+    to update when it changes, directly or through other computed fields, in that order"""
+
+    order: Tuple[str, ...] = ()
+    downstream: Dict[Path, Tuple[str, ...]] = field(default_factory=dict)
+
+    @classmethod
+    def of(cls, form_class: Type[DeclaredContainer]) -> DependencyGraph:
+        """Raises ValueError for inputs that are not fields of form_class or for cycles"""
+        computed: Dict[str, ComputedField] = {}
+        for entry in getattr(form_class, "schema").entries:
+            if isinstance(entry.declaration, ComputedField):
+                computed[entry.attribute_name] = entry.declaration
+        if not computed:
+            return cls()
+        for name, declaration in computed.items():
+            for path in declaration.paths:
+                _check_path(form_class, name, path)
+        order = _sorted(form_class, computed)
+        direct: Dict[Path, List[str]] = {}
+        for name in order:
+            for path in computed[name].paths:
+                direct.setdefault(path, []).append(name)
+        position = {name: index for index, name in enumerate(order)}
+        downstream: Dict[Path, Tuple[str, ...]] = {}
+        for path, names in direct.items():
+            reached = set(names)
+            pending = list(reached)
+            while pending:
+                for name in direct.get((pending.pop(),), ()):
+                    if name not in reached:
+                        reached.add(name)
+                        pending.append(name)
+            downstream[path] = tuple(sorted(reached, key=position.__getitem__))
+        return cls(order, downstream)
+
+
+def _check_path(form_class: Type[DeclaredContainer], name: str, path: Path) -> None:
+    klass = form_class
+    for depth, key in enumerate(path):
+        entry = next((entry for entry in getattr(klass, "schema").entries if entry.attribute_name == key), None)
+        if entry is None:
+            raise ValueError(f"Input {'.'.join(path)} of {form_class.__name__}.{name} is not declared")
+        last = depth == len(path) - 1
+        if last and entry.is_container:
+            raise ValueError(f"Input {'.'.join(path)} of {form_class.__name__}.{name} is a form, not a field")
+        if not last and not entry.is_container:
+            raise ValueError(f"{key} in input {'.'.join(path)} of {form_class.__name__}.{name} is not a form")
+        klass = cast(Any, type(entry.declaration))
+
+
+def _sorted(form_class: Type[DeclaredContainer], computed: Dict[str, ComputedField]) -> Tuple[str, ...]:
+    """Computed fields after the computed fields of the same form they use"""
+    order: List[str] = []
+    # 1 while visiting the inputs of a field, 2 when done
+    state: Dict[str, int] = {}
+
+    def visit(name: str, chain: Tuple[str, ...]) -> None:
+        if state.get(name) == 2:
+            return
+        if state.get(name) == 1:
+            cycle = " -> ".join(chain[chain.index(name) :] + (name,))
+            raise ValueError(f"Computed fields of {form_class.__name__} depend on each other: {cycle}")
+        state[name] = 1
+        for path in computed[name].paths:
+            if len(path) == 1 and path[0] in computed:
+                visit(path[0], chain + (name,))
+        state[name] = 2
+        order.append(name)
+
+    for name in computed:
+        visit(name, ())
+    return tuple(order)
@@ -0,0 +1,93 @@
+from __future__ import annotations
+import sys
+from typing import Dict, Iterable, List, Optional, Set, Tuple, cast, TYPE_CHECKING
+
+from magiqt import profiling
+from magiqt.interface import DeclarationItem, DeclaredContainer
+
+if TYPE_CHECKING:
+    from PyQt5.QtCore import QTimer
+
+_Changes = Dict[int, Tuple[DeclarationItem, Set[str]]]
+
+
+def _add(by_depth: List[_Changes], container: DeclarationItem, attrs: Iterable[str]) -> None:
+    depth = container.depth()
+    while len(by_depth) <= depth:
+        by_depth.append({})
+    entry = by_depth[depth].get(id(container))
+    if entry is None:
+        by_depth[depth][id(container)] = (container, set(attrs))
+    else:
+        entry[1].update(attrs)
+
+
+def deliver_changes(changes: Iterable[Tuple[DeclarationItem, Set[str]]]) -> None:
+    """Run on_change_batch once per container, deepest first, including the parents changes propagate to"""
+    by_depth: List[_Changes] = []
+    for container, attrs in changes:
+        _add(by_depth, container, attrs)
+    for depth in range(len(by_depth) - 1, -1, -1):
+        for container, attrs in by_depth[depth].values():
+            declaration = cast(DeclaredContainer, container.declaration)
+            if profiling.PROFILER.enabled:
+                with profiling.span("on_change", type(declaration).__name__, depth=depth, attrs=sorted(attrs)):
+                    propagates = declaration.on_change_batch(frozenset(attrs), container)
+            else:
+                propagates = declaration.on_change_batch(frozenset(attrs), container)
+            if propagates and container.parent is not None:
+                _add(by_depth, container.parent, (declaration.attribute_name,))
+
+
+class ChangeDispatcher:
+    """Collects changes of a form tree and delivers them together after the current event loop turn,
+    or once no change has been posted for delay_ms. Without a QCoreApplication changes wait for flush()"""
+
+    def __init__(self, delay_ms: int = 0) -> None:
+        self._changes: _Changes = {}
+        self._delay_ms = delay_ms
+        self._timer: Optional[QTimer] = None
+
+    @property
+    def delay_ms(self) -> int:
+        return self._delay_ms
+
+    @delay_ms.setter
+    def delay_ms(self, delay_ms: int) -> None:
+        self._delay_ms = delay_ms
+        if self._timer is not None:
+            self._timer.setInterval(delay_ms)
+
+    def post(self, container: DeclarationItem, attr: str) -> None:
+        self.post_many(container, (attr,))
+
+    def post_many(self, container: DeclarationItem, attrs: Iterable[str]) -> None:
+        entry = self._changes.get(id(container))
+        if entry is None:
+            self._changes[id(container)] = (container, set(attrs))
+        else:
+            entry[1].update(attrs)
+        timer = self._timer
+        if timer is None:
+            # Without Qt loaded there is no application to run a timer, changes wait for flush()
+            if "PyQt5.QtCore" not in sys.modules:
+                return
+            from PyQt5.QtCore import QCoreApplication, QTimer  # pylint: disable=C0415
+
+            if QCoreApplication.instance() is None:
+                return
+            timer = self._timer = QTimer()
+            timer.setSingleShot(True)
+            timer.setInterval(self._delay_ms)
+            timer.timeout.connect(self.flush)
+        if self._delay_ms > 0 or not timer.isActive():
+            timer.start()
+
+    def pending(self) -> bool:
+        return bool(self._changes)
+
+    def flush(self) -> None:
+        if self._timer is not None:
+            self._timer.stop()
+        changes, self._changes = self._changes, {}
+        deliver_changes(changes.values())
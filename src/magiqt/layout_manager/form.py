@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+from contextlib import nullcontext
+from inspect import isawaitable
 from dataclasses import dataclass, field
 from typing import (
     Optional,
@@ -11,75 +13,227 @@ from typing import (
     Type,
     cast,
     Callable,
+    ClassVar,
+    Mapping,
+    TYPE_CHECKING,
+    FrozenSet,
+    Union,
+    BinaryIO,
+    List,
+    ContextManager,
 )
 
-from PyQt5.QtWidgets import QGridLayout
-
+from magiqt import profiling
 from magiqt.interface import (
     DeclaredContainer,
     DeclarationItem,
-    Declaration,
-    IsEditable,
 )
-from magiqt.widgets.group_box import GroupBox
+from magiqt.layout_manager.dependencies import DependencyGraph
+from magiqt.layout_manager.dispatch import ChangeDispatcher
+from magiqt.layout_manager.history import History
+from magiqt.layout_manager.snapshot import decode, decode_file, encode
+from magiqt.layout_manager.schema import FormSchema
+
+
+# Qt is imported when widgets are created or background hooks run, declarations load without it
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+    from PyQt5.QtWidgets import QGridLayout
+    from magiqt.layout_manager.frozen import FrozenForm
+    from magiqt.widgets.group_box import GroupBox
+    from magiqt.field.fields import ComputedField, FieldBase
 
 
 _Form = TypeVar("_Form", bound="Form")
 
 
+@dataclass(frozen=True)
+class _SnapshotPlan:
+    """Field nodes of a form in snapshot order"""
+
+    items: Tuple[DeclarationItem, ...]
+    # Positions of fields with their own snapshot_value or restore_value, and of the others
+    custom: Tuple[int, ...]
+    plain: Tuple[int, ...]
+    # Field names per parent node, to notify each form once on restore
+    changes: Tuple[Tuple[DeclarationItem, List[str]], ...]
+
+
 @dataclass
-class Form(DeclaredContainer):
+class Form(DeclaredContainer):  # pylint: disable=R0904
     title: str
     node: DeclarationItem = field(init=False, repr=False)
+    dispatcher: Optional[ChangeDispatcher] = field(default=None, init=False, repr=False, compare=False)
+    _snapshot: Optional[_SnapshotPlan] = field(default=None, init=False, repr=False, compare=False)
+    # Set on the root form by enable_history
+    history: Optional[History] = field(default=None, init=False, repr=False, compare=False)
+    schema: ClassVar[FormSchema] = FormSchema()
+    # Changes are delivered after this many ms without further changes, 0 coalesces one event loop turn
+    change_delay_ms: ClassVar[int] = 0
+    # Where on_change_background runs: "thread", "process" or an Executor
+    background: ClassVar[Union[str, Executor]] = "thread"
+    has_background_handler: ClassVar[bool] = False
+    dependencies: ClassVar[DependencyGraph] = DependencyGraph()
+
+    def __init_subclass__(cls, **kwargs: Any) -> None:
+        super().__init_subclass__(**kwargs)
+        cls.schema = FormSchema.of(cls)
+        cls.dependencies = DependencyGraph.of(cls)
+        cls.has_background_handler = cls.on_change_background is not Form.on_change_background
 
     def set_window_title(self, title: str) -> None:
         self.widget().setWindowTitle(title)
 
     @classmethod
-    def build(cls: Type[_Form], form_title: str, window_title: str = "") -> _Form:
-        instance = cls(form_title)
-        instance.node = DeclarationItem(instance)
-        instance.create_widgets(instance.node)
-        instance.attribute_name = "__root__"
-        if window_title:
-            instance.widget().setWindowTitle(window_title)
+    def build(
+        cls: Type[_Form], form_title: str, window_title: str = "", lazy: bool = False, headless: bool = False
+    ) -> _Form:
+        """With lazy=True nested forms start collapsed and create their widgets when first expanded.
+        With headless=True no widgets are created and no QApplication is needed, see attach_view"""
+        with profiling.span("build", cls.__name__, lazy=lazy, headless=headless):
+            instance = cls(form_title)
+            instance.node = DeclarationItem(instance)
+            instance.node.handle = instance
+            instance.dispatcher = ChangeDispatcher(cls.change_delay_ms)
+            instance._build_nodes(instance.node, lazy)
+            instance._compute(instance.node)
+            instance.attribute_name = "__root__"
+            if not headless:
+                instance.attach_view(window_title)
         return instance
 
+    def attach_view(self, window_title: str = "") -> GroupBox:
+        """Create the widgets of a form built with headless=True, showing the values set so far"""
+        if self.node.parent is not None:
+            raise ValueError("Only the root form can attach a view")
+        if not self.node.widgets:
+            self.create_widgets(self.node)
+        if window_title:
+            self.widget().setWindowTitle(window_title)
+        return self.widget()
+
     def create_widgets(self, this_node: DeclarationItem) -> Tuple[GroupBox]:
+        from PyQt5.QtWidgets import QGridLayout  # pylint: disable=C0415
+        from magiqt.widgets.group_box import GroupBox  # pylint: disable=C0415
+
         parent_node = this_node.parent
         parent_widget: Optional[GroupBox] = parent_node.widgets[0] if parent_node else None  # type: ignore
         widget = GroupBox(self.title, parent_widget)
         widget.changed.connect(self._changed(this_node))
         QGridLayout(widget)  # To bind layout to widget
         this_node.widgets = (widget,)
-        self._build_children(this_node)
+        if this_node.lazy:
+            widget.setCheckable(True)
+            widget.setChecked(False)
+            widget.toggled.connect(self._expanded(this_node))
+        else:
+            self._build_children(this_node)
         return (widget,)
 
+    def _expanded(self, this_item: DeclarationItem) -> Callable[[bool], None]:
+        def _inner(expanded: bool) -> None:
+            if expanded:
+                self._materialize(this_item)
+            for child in this_item.children.values():
+                for widget in child.widgets:
+                    widget.setVisible(expanded)
+
+        return _inner
+
+    def materialize(self) -> None:
+        """Create the widgets of this form and of its collapsed parents"""
+        self._materialize(self.node)
+
+    def _materialize(self, this_node: DeclarationItem) -> None:
+        parent = this_node.parent
+        if not this_node.widgets and parent is not None:
+            cast(Form, parent.declaration)._materialize(parent)  # pylint: disable=W0212
+        if not this_node.lazy:
+            return
+        this_node.lazy = False
+        self._build_children(this_node)
+        cast("GroupBox", this_node.widgets[0]).setChecked(True)
+
     def _changed(self, this_item: DeclarationItem) -> Callable[[str], None]:
-        def _inner(txt: str) -> None:  # pylint: disable=W0613
-            self._on_change(self.attribute_name, this_item)
+        def _inner(attr: str) -> None:
+            self.root_dispatcher(this_item).post(this_item, attr)
 
         return _inner
 
+    @staticmethod
+    def root_dispatcher(this_item: DeclarationItem) -> ChangeDispatcher:
+        dispatcher = cast(Form, this_item.root().handle).dispatcher
+        if dispatcher is None:
+            raise ValueError("Form was not built with Form.build")
+        return dispatcher
+
     def widget(self) -> GroupBox:
         return self.node.widgets[0]  # type: ignore
 
+    def spans(self) -> Tuple[int]:
+        return (3,)
+
+    def _build_nodes(self, this_node: DeclarationItem, lazy: bool) -> None:
+        for entry, value in zip(self.schema.entries, self.schema.initial_values()):
+            item = DeclarationItem(entry.declaration, lazy=lazy and entry.is_container, value=value)
+            this_node.add_child(entry.attribute_name, item)
+            if entry.is_container:
+                cast(Form, entry.declaration)._build_nodes(item, lazy)  # pylint: disable=W0212
+
+    def _compute(self, this_node: DeclarationItem) -> None:
+        """Update all computed fields, those of sub-forms first"""
+        for entry in self.schema.sub_forms:
+            cast(Form, entry.declaration)._compute(this_node.children[entry.attribute_name])  # pylint: disable=W0212
+        for name in self.dependencies.order:
+            child = this_node.children[name]
+            cast("ComputedField", child.declaration).compute(child)
+
     def _build_children(self, this_node: DeclarationItem) -> None:
-        fields = (f for f in type(self).__dict__.values() if isinstance(f, Declaration))
-        layout = cast(QGridLayout, this_node.widgets[0].layout())
-        for line, user_field in enumerate(fields):
-            item = DeclarationItem(user_field)
-            this_node.add_child(user_field.attribute_name, item)
-            item.widgets = user_field.create_widgets(item)
-            column = 0
-            for widget in item.widgets:
-                layout.addWidget(widget, line, column, 1, widget.span())
-                column += 1
+        layout = cast("QGridLayout", this_node.widgets[0].layout())
+        with profiling.span("create_widgets", type(self).__name__, fields=len(self.schema)):
+            for line, entry in enumerate(self.schema.entries):
+                item = this_node.children[entry.attribute_name]
+                item.widgets = entry.declaration.create_widgets(item)
+                for column, (widget, span) in enumerate(zip(item.widgets, entry.spans)):
+                    layout.addWidget(widget, line, column, 1, span)
+
+    def on_change_batch(self, attrs: FrozenSet[str], this_item: DeclarationItem) -> bool:
+        propagate = super().on_change_batch(attrs, this_item)
+        if self.has_background_handler and self.is_valid(this_item):
+            from magiqt.layout_manager.background import runner  # pylint: disable=C0415
+            from magiqt.layout_manager.frozen import FrozenForm  # pylint: disable=C0415
+
+            values = FrozenForm(self._as_dict(this_item))
+            runner().submit(this_item, type(self).on_change_background, values, self.background)
+        return propagate
 
     def on_change(self, attr: str, this_item: DeclarationItem) -> bool:
-        """Hook after validation. Return True to propagate"""
+        """Hook after validation. Return True to propagate.
+        May be async def: it then runs as a task, cancelled by the next change, and propagates when it returns True"""
         return True
 
+    def _propagates(self, changed: Any, this_item: DeclarationItem) -> bool:
+        if not isawaitable(changed):
+            return bool(changed)
+        from magiqt.layout_manager.background import run_task  # pylint: disable=C0415
+
+        run_task(this_item, changed, lambda result: self._propagate_later(this_item, result))
+        return False
+
+    def _propagate_later(self, this_item: DeclarationItem, changed: Any) -> None:
+        if changed and this_item.parent is not None:
+            self.root_dispatcher(this_item).post(this_item.parent, self.attribute_name)
+
+    @staticmethod
+    def on_change_background(values: FrozenForm) -> Any:  # pylint: disable=W0613
+        """Hook in a worker after each valid change, with a read-only copy of this form's values. Runs only when
+        overridden. Must not touch widgets. With background = "process" it must be picklable, i.e. defined at
+        module level"""
+        return None
+
+    def on_background_result(self, result: Any, this_item: DeclarationItem) -> None:
+        """Hook in the GUI thread with the result of the latest on_change_background. Older results are dropped"""
+
     def on_change_pre_validate(self, attr: str, this_item: DeclarationItem) -> bool:
         """Hook before validation. Return True to propagate"""
         return True
@@ -96,27 +250,133 @@ class Form(DeclaredContainer):
 
     def _as_dict(self, declaration_item: DeclarationItem) -> Dict[str, Any]:
         result: Dict[str, Any] = {}
-        for key, declaration in declaration_item.children.items():
-            label_or_group, *edit_and_unit = declaration.widgets
-            if isinstance(label_or_group, GroupBox):
-                result[key] = self._as_dict(declaration)
-                continue
-            edit, *unit = edit_and_unit
-            if isinstance(edit, IsEditable):
-                result[key] = edit.converted()
-            if unit:
-                continue
+        for key, item in declaration_item.children.items():
+            if isinstance(item.declaration, DeclaredContainer):
+                result[key] = self._as_dict(item)
+            else:
+                result[key] = item.value
         return result
 
     def as_dict(self) -> Dict[str, Any]:
         return self._as_dict(self.node)
 
+    def enable_history(self, max_steps: int = 1000, max_deltas: int = 100_000, merge_s: float = 1.0) -> History:
+        """Record changes of all fields for undo and redo, see History"""
+        if self.node.parent is not None:
+            raise ValueError("Only the root form can keep a history")
+        if self.history is None:
+            self.history = History(self.root_dispatcher(self.node), max_steps, max_deltas, merge_s)
+        return self.history
+
+    def _history_step(self) -> ContextManager[None]:
+        history = cast(Form, self.node.root().handle).history
+        return nullcontext() if history is None else history.step()
+
+    def set_from_dict(self, values: Mapping[str, Any]) -> None:
+        """Set many fields at once, with nested dicts for sub-forms. Each changed form is notified once"""
+        dispatcher = self.root_dispatcher(self.node)
+        with self._history_step():
+            self._load(self.node, values, dispatcher)
+        dispatcher.flush()
+
+    def _load(self, this_node: DeclarationItem, values: Mapping[str, Any], dispatcher: ChangeDispatcher) -> None:
+        for key, value in values.items():
+            item = this_node.children.get(key)
+            if item is None:
+                raise ValueError(f"{key} is not declared in {type(this_node.declaration).__name__}")
+            if isinstance(item.declaration, DeclaredContainer):
+                if not isinstance(value, Mapping):
+                    raise ValueError(f"Expected a mapping for form {key}, got {value!r}")
+                self._load(item, value, dispatcher)
+                continue
+            cast("FieldBase[Any, Any]", item.declaration).load(item, value)
+            dispatcher.post(this_node, key)
+
+    def snapshot(self, file: Optional[BinaryIO] = None) -> bytes:
+        """Values of all fields in a compact binary format, for restore. Also written to file if given.
+        Fields store their converted values, see FieldBase.snapshot_value"""
+        with profiling.span("snapshot", type(self).__name__):
+            plan = self._snapshot_plan()
+            values = [item.value for item in plan.items]
+            for position in plan.custom:
+                item = plan.items[position]
+                values[position] = cast("FieldBase[Any, Any]", item.declaration).snapshot_value(item)
+            chunks = encode(self.schema.fingerprint(), values)
+        if file is not None:
+            for chunk in chunks:
+                file.write(chunk)
+        return b"".join(chunks)
+
+    def restore(self, data: Union[bytes, BinaryIO]) -> None:
+        """Set all fields from a snapshot of a form of the same schema. Each form is notified once, like with
+        set_from_dict. Raises ValueError for snapshots of other schemas"""
+        with profiling.span("restore", type(self).__name__):
+            if isinstance(data, (bytes, bytearray, memoryview)):
+                values = decode(data, self.schema.fingerprint())
+            else:
+                values = decode_file(data, self.schema.fingerprint())
+            plan = self._snapshot_plan()
+            if len(values) != len(plan.items):
+                raise ValueError(f"Snapshot has {len(values)} values, {type(self).__name__} has {len(plan.items)}")
+            from magiqt.field.fields import FieldBase  # pylint: disable=C0415
+
+            with self._history_step():
+                for position in plan.custom:
+                    item = plan.items[position]
+                    cast("FieldBase[Any, Any]", item.declaration).restore_value(item, values[position])
+                if plan.custom:
+                    FieldBase.restore_values([plan.items[p] for p in plan.plain], [values[p] for p in plan.plain])
+                else:
+                    FieldBase.restore_values(plan.items, values)
+                # Computed fields of parent forms may use the restored fields
+                root = self.node.root()
+                cast(Form, root.handle)._compute(root)  # pylint: disable=W0212
+            dispatcher = self.root_dispatcher(self.node)
+            for container, attrs in plan.changes:
+                dispatcher.post_many(container, attrs)
+        dispatcher.flush()
+
+    def _snapshot_plan(self) -> _SnapshotPlan:
+        """Computed once as the node tree does not change after build"""
+        if self._snapshot is None:
+            from magiqt.field.fields import FieldBase  # pylint: disable=C0415
+
+            items = self._field_items(self.node)
+            custom: List[int] = []
+            plain: List[int] = []
+            changes: Dict[int, Tuple[DeclarationItem, List[str]]] = {}
+            for position, item in enumerate(items):
+                kind: Any = type(item.declaration)
+                if kind.snapshot_value is FieldBase.snapshot_value and kind.restore_value is FieldBase.restore_value:
+                    plain.append(position)
+                else:
+                    custom.append(position)
+                parent = cast(DeclarationItem, item.parent)
+                changes.setdefault(id(parent), (parent, []))[1].append(item.declaration.attribute_name)
+            self._snapshot = _SnapshotPlan(tuple(items), tuple(custom), tuple(plain), tuple(changes.values()))
+        return self._snapshot
+
+    @staticmethod
+    def _field_items(this_node: DeclarationItem) -> List[DeclarationItem]:
+        items: List[DeclarationItem] = []
+        entries = cast(Form, this_node.declaration).schema.entries
+        for entry, item in zip(entries, this_node.children.values()):
+            if entry.is_container:
+                items.extend(Form._field_items(item))
+            else:
+                items.append(item)
+        return items
+
     def __get__(self: _Form, instance: Optional[DeclaredContainer], owner: Type[DeclaredContainer]) -> _Form:
         if instance is None:
             return self
-        new = type(self)(self.title)
-        new.node = instance.node.children[self.attribute_name]
-        return new
+        node = instance.node.children[self.attribute_name]
+        handle: Optional[_Form] = node.handle
+        if handle is None:
+            handle = node.handle = type(self)(self.title)
+            handle.node = node
+            handle.attribute_name = self.attribute_name
+        return handle
 
     def __set__(self, instance: Any, value: Any) -> NoReturn:
         raise ValueError("Cannot set form. Use set_from_dict instead")
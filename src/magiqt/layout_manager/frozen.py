@@ -0,0 +1,43 @@
+from __future__ import annotations
+from typing import Any, Dict, Iterator, Mapping
+
+
+class FrozenForm(Mapping[str, Any]):
+    """Immutable, picklable copy of form values. Sub-forms are FrozenForms, values are also attributes"""
+
+    __slots__ = ("_values",)
+    _values: Dict[str, Any]
+
+    def __init__(self, values: Mapping[str, Any]) -> None:
+        object.__setattr__(
+            self,
+            "_values",
+            {key: FrozenForm(value) if isinstance(value, Mapping) else value for key, value in values.items()},
+        )
+
+    def __getitem__(self, key: str) -> Any:
+        return self._values[key]
+
+    def __getattr__(self, key: str) -> Any:
+        try:
+            return self._values[key]
+        except KeyError:
+            raise AttributeError(key) from None
+
+    def __setattr__(self, key: str, value: Any) -> None:
+        raise AttributeError("FrozenForm is immutable")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return self._values
+
+    def __setstate__(self, values: Dict[str, Any]) -> None:
+        object.__setattr__(self, "_values", values)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self._values!r})"
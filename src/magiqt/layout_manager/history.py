@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from time import monotonic
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple, cast, TYPE_CHECKING
+
+from magiqt.interface import DeclarationItem
+
+if TYPE_CHECKING:
+    from magiqt.field.fields import FieldBase
+    from magiqt.layout_manager.dispatch import ChangeDispatcher
+
+# Field node, value before and value after the change
+Delta = Tuple[DeclarationItem, Any, Any]
+
+
+@dataclass
+class Step:
+    deltas: List[Delta] = field(default_factory=list)
+    time: float = 0.0
+    # Steps of a single change take the following changes of the same field within History.merge_s
+    mergeable: bool = False
+
+
+class History:  # pylint: disable=R0902
+    """Undo and redo of field values of one form tree. Records the value before and after each change,
+    not copies of the form. Changes of set_from_dict and restore are one step each"""
+
+    def __init__(
+        self, dispatcher: ChangeDispatcher, max_steps: int = 1000, max_deltas: int = 100_000, merge_s: float = 1.0
+    ) -> None:
+        self.dispatcher = dispatcher
+        self.max_steps = max_steps
+        # Bounds memory, the oldest steps are dropped first
+        self.max_deltas = max_deltas
+        self.merge_s = merge_s
+        self._undo: Deque[Step] = deque()
+        self._redo: List[Step] = []
+        self._deltas = 0
+        self._open: Optional[Step] = None
+        self._depth = 0
+        self._applying = False
+
+    def __len__(self) -> int:
+        return len(self._undo)
+
+    def can_undo(self) -> bool:
+        return bool(self._undo)
+
+    def can_redo(self) -> bool:
+        return bool(self._redo)
+
+    def clear(self) -> None:
+        self._undo.clear()
+        self._redo.clear()
+        self._deltas = 0
+
+    def record(self, this_node: DeclarationItem, old: Any, new: Any) -> None:
+        """Called by fields after their value changed"""
+        if self._applying or old == new:
+            return
+        delta = (this_node, old, new)
+        if self._open is not None:
+            self._open.deltas.append(delta)
+            return
+        self._redo.clear()
+        now = monotonic()
+        last = self._undo[-1] if self._undo else None
+        if last is not None and last.mergeable and last.deltas[0][0] is this_node and now - last.time < self.merge_s:
+            last.deltas[0] = (this_node, last.deltas[0][1], new)
+            last.time = now
+            return
+        self._push(Step([delta], now, mergeable=True))
+
+    @contextmanager
+    def step(self) -> Iterator[None]:
+        """Record all changes in the block as one step"""
+        if self._depth == 0:
+            self._open = Step()
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            if self._depth == 0:
+                step, self._open = cast(Step, self._open), None
+                if step.deltas:
+                    self._redo.clear()
+                    step.time = monotonic()
+                    self._push(step)
+
+    def undo(self) -> bool:
+        """Revert the last step. Each changed form is notified once. Returns False if there was none"""
+        if not self._undo:
+            return False
+        step = self._undo.pop()
+        self._deltas -= len(step.deltas)
+        self._apply(reversed(step.deltas), 1)
+        self._redo.append(step)
+        return True
+
+    def redo(self) -> bool:
+        if not self._redo:
+            return False
+        step = self._redo.pop()
+        self._apply(iter(step.deltas), 2)
+        step.mergeable = False
+        self._undo.append(step)
+        self._deltas += len(step.deltas)
+        return True
+
+    def _push(self, step: Step) -> None:
+        if self._undo:
+            self._undo[-1].mergeable = False
+        self._undo.append(step)
+        self._deltas += len(step.deltas)
+        while self._undo and (len(self._undo) > self.max_steps or self._deltas > self.max_deltas):
+            self._deltas -= len(self._undo.popleft().deltas)
+
+    def _apply(self, deltas: Iterator[Delta], position: int) -> None:
+        changed: Dict[int, Tuple[DeclarationItem, List[str]]] = {}
+        self._applying = True
+        try:
+            for delta in deltas:
+                this_node = delta[0]
+                declaration = cast("FieldBase[Any, Any]", this_node.declaration)
+                declaration.load(this_node, declaration.text_of(delta[position]))
+                parent = cast(DeclarationItem, this_node.parent)
+                changed.setdefault(id(parent), (parent, []))[1].append(declaration.attribute_name)
+        finally:
+            self._applying = False
+        for parent, attrs in changed.values():
+            self.dispatcher.post_many(parent, attrs)
+        self.dispatcher.flush()
@@ -0,0 +1,66 @@
+from __future__ import annotations
+import hashlib
+from dataclasses import dataclass, field
+from typing import Tuple, Any, Dict, Type, Optional, cast
+
+from magiqt.interface import Declaration, DeclaredContainer
+
+
+@dataclass(frozen=True)
+class SchemaEntry:
+    attribute_name: str
+    declaration: Declaration[Any]
+    spans: Tuple[int, ...]
+    is_container: bool
+
+
+@dataclass(frozen=True)
+class FormSchema:
+    entries: Tuple[SchemaEntry, ...] = ()
+    _initial_values: Optional[Tuple[Any, ...]] = field(default=None, init=False, repr=False, compare=False)
+    _fingerprint: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
+
+    @classmethod
+    def of(cls, form_class: Type[DeclaredContainer]) -> FormSchema:
+        """Declarations of form_class and its bases in definition order. Overrides keep the base position"""
+        declarations: Dict[str, Declaration[Any]] = {}
+        for klass in reversed(form_class.__mro__):
+            for name, value in vars(klass).items():
+                if isinstance(value, Declaration):
+                    declarations[name] = value
+                else:
+                    declarations.pop(name, None)
+        entries = tuple(
+            SchemaEntry(name, declaration, tuple(declaration.spans()), isinstance(declaration, DeclaredContainer))
+            for name, declaration in declarations.items()
+        )
+        return cls(entries)
+
+    def initial_values(self) -> Tuple[Any, ...]:
+        """Initial value of each entry, computed on first use as ranges may load their items lazily"""
+        if self._initial_values is None:
+            values = tuple(entry.declaration.initial_value() for entry in self.entries)
+            object.__setattr__(self, "_initial_values", values)
+        return self._initial_values  # type: ignore
+
+    def fingerprint(self) -> bytes:
+        """16 byte digest of the names and declaration types of the entries, recursing into sub-forms"""
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(digest_size=16)
+            for entry in self.entries:
+                kind = type(entry.declaration)
+                digest.update(f"{entry.attribute_name}:{kind.__module__}.{kind.__qualname__};".encode())
+                if entry.is_container:
+                    digest.update(cast(FormSchema, getattr(kind, "schema")).fingerprint())
+                else:
+                    validator = getattr(entry.declaration, "validator", None)
+                    digest.update(getattr(validator, "__qualname__", "").encode())
+            object.__setattr__(self, "_fingerprint", digest.digest())
+        return self._fingerprint  # type: ignore
+
+    @property
+    def sub_forms(self) -> Tuple[SchemaEntry, ...]:
+        return tuple(entry for entry in self.entries if entry.is_container)
+
+    def __len__(self) -> int:
+        return len(self.entries)
@@ -0,0 +1,168 @@
+"""Binary snapshots of form values, see Form.snapshot and Form.restore.
+
+Layout, little endian: header (magic, version, schema fingerprint, value count), one type tag per value,
+the number of values of each type and the size of the text block, then the values grouped by type: int64s,
+float64s, one byte per bool, the lengths of the strings, of the integers beyond 64 bits and of the literals
+in characters, and all their text as one UTF-8 block. Values of other types are stored as literals, their
+repr, if ast.literal_eval reads them back. Values are in the depth first order of the schema entries"""
+from __future__ import annotations
+
+import ast
+import struct
+import sys
+from array import array
+from itertools import accumulate, compress, repeat
+from operator import eq
+from typing import Any, BinaryIO, Callable, Iterator, List, Sequence
+
+MAGIC = b"MQSN"
+VERSION = 2
+_HEADER = struct.Struct("<4sB16sI")
+# ints, floats, strings, big ints, bools, literals, bytes of the text block
+_COUNTS = struct.Struct("<IIIIIIQ")
+
+_NONE, _INT, _FLOAT, _STR, _BIG_INT, _BOOL, _LITERAL = range(7)
+_TAGS = {type(None): _NONE, int: _INT, float: _FLOAT, str: _STR, bool: _BOOL}
+_SWAP = sys.byteorder == "big"
+
+
+def _of_tag(values: Sequence[Any], tags: bytes, tag: int) -> Iterator[Any]:
+    return compress(values, map(eq, tags, repeat(tag)))
+
+
+def encode(fingerprint: bytes, values: Sequence[Any]) -> List[bytes]:
+    """Chunks of the snapshot of values. Values other than None, bool, int, float and str must be literals"""
+    tags = bytes(map(_TAGS.get, map(type, values), repeat(_LITERAL)))
+    try:
+        ints = array("q", _of_tag(values, tags, _INT))
+    except OverflowError:
+        # Rare, so only then integers are checked one by one
+        tags = bytes(
+            _BIG_INT if tag == _INT and not -(2**63) <= value < 2**63 else tag for tag, value in zip(tags, values)
+        )
+        ints = array("q", _of_tag(values, tags, _INT))
+    floats = array("d", _of_tag(values, tags, _FLOAT))
+    bools = bytes(_of_tag(values, tags, _BOOL))
+    texts = list(_of_tag(values, tags, _STR))
+    big_ints = list(map(str, _of_tag(values, tags, _BIG_INT)))
+    literals = list(map(_literal, _of_tag(values, tags, _LITERAL)))
+    strings = texts + big_ints + literals
+    lengths = array("I", map(len, strings))
+    block = "".join(strings).encode()
+    if _SWAP:  # pragma: no cover
+        for column in (ints, floats, lengths):
+            column.byteswap()
+    counts = (len(ints), len(floats), len(texts), len(big_ints), len(bools), len(literals), len(block))
+    return [
+        _HEADER.pack(MAGIC, VERSION, fingerprint, len(values)),
+        tags,
+        _COUNTS.pack(*counts),
+        ints.tobytes(),
+        floats.tobytes(),
+        bools,
+        lengths.tobytes(),
+        block,
+    ]
+
+
+def decode(data: bytes, fingerprint: bytes) -> List[Any]:
+    """Values of a snapshot, which must have been taken of a form with this schema fingerprint"""
+    view = memoryview(data)
+    offset = 0
+
+    def read(size: int) -> memoryview:
+        nonlocal offset
+        end = offset + size
+        if end > len(view):
+            raise ValueError("Snapshot is truncated")
+        chunk, offset = view[offset:end], end
+        return chunk
+
+    values = _decode(read, fingerprint)
+    if offset != len(view):
+        raise ValueError("Snapshot is corrupt")
+    return values
+
+
+def decode_file(file: BinaryIO, fingerprint: bytes) -> List[Any]:
+    """decode reading file section by section, it is not read into memory as a whole first"""
+
+    def read(size: int) -> bytes:
+        chunk = file.read(size)
+        if len(chunk) != size:
+            raise ValueError("Snapshot is truncated")
+        return chunk
+
+    return _decode(read, fingerprint)
+
+
+def _decode(read: Callable[[int], Any], fingerprint: bytes) -> List[Any]:  # pylint: disable=R0914
+    magic, version, found, count = _HEADER.unpack(read(_HEADER.size))
+    if magic != MAGIC:
+        raise ValueError("Not a form snapshot")
+    if version != VERSION:
+        raise ValueError(f"Unsupported snapshot version {version}")
+    if found != fingerprint:
+        raise ValueError("Snapshot was taken of a form with a different schema")
+    tags = bytes(read(count))
+    n_ints, n_floats, n_texts, n_big_ints, n_bools, n_literals, n_bytes = _COUNTS.unpack(read(_COUNTS.size))
+    ints = _column("q", read, n_ints)
+    floats = _column("d", read, n_floats)
+    bools = list(map(bool, bytes(read(n_bools))))
+    lengths = _column("I", read, n_texts + n_big_ints + n_literals)
+    strings = _strings(read(n_bytes), lengths)
+    split = n_texts + n_big_ints
+    columns = [
+        repeat(None),
+        iter(ints),
+        iter(floats),
+        iter(strings[:n_texts]),
+        map(int, strings[n_texts:split]),
+        iter(bools),
+        map(_literal_value, strings[split:]),
+    ]
+    try:
+        # A column running out ends the map early, caught by the length check
+        values = list(map(next, map(columns.__getitem__, tags)))
+    except IndexError:
+        raise ValueError("Snapshot has values of unknown type") from None
+    if len(values) != count:
+        raise ValueError("Snapshot is corrupt")
+    return values
+
+
+def _literal(value: Any) -> str:
+    text = repr(value)
+    try:
+        readable = type(ast.literal_eval(text)) is type(value)  # pylint: disable=C0123
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        readable = False
+    if not readable:
+        raise ValueError(f"Cannot snapshot value {value!r} of type {type(value).__name__}")
+    return text
+
+
+def _literal_value(text: str) -> Any:
+    try:
+        return ast.literal_eval(text)
+    except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+        raise ValueError("Snapshot is corrupt") from None
+
+
+def _strings(block: Any, lengths: Sequence[int]) -> List[str]:
+    try:
+        text = str(block, "utf-8")
+    except UnicodeDecodeError:
+        raise ValueError("Snapshot is truncated") from None
+    ends = list(accumulate(lengths))
+    if (ends[-1] if ends else 0) != len(text):
+        raise ValueError("Snapshot is truncated")
+    return [text[start:end] for start, end in zip([0] + ends, ends)]
+
+
+def _column(typecode: str, read: Callable[[int], Any], count: int) -> array[Any]:
+    column = array(typecode)
+    column.frombytes(read(count * column.itemsize))
+    if _SWAP:  # pragma: no cover
+        column.byteswap()
+    return column
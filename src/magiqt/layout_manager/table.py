@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Type, cast, TYPE_CHECKING
+
+from PyQt5.QtCore import QAbstractItemModel, QAbstractTableModel, QModelIndex, QObject, Qt
+from PyQt5.QtGui import QBrush, QColor
+from PyQt5.QtWidgets import (
+    QAbstractItemView,
+    QHeaderView,
+    QStyledItemDelegate,
+    QStyleOptionViewItem,
+    QTableView,
+    QWidget,
+)
+
+from magiqt.interface import Validator, ValidatorResult
+
+if TYPE_CHECKING:
+    from magiqt.field.fields import FieldBase
+    from magiqt.layout_manager.form import Form
+    from magiqt.widgets.input.abstract import InputWidget
+
+_DISPLAY_ROLE = Qt.DisplayRole
+_EDIT_ROLE = Qt.EditRole
+_FOREGROUND_ROLE = Qt.ForegroundRole
+_INVALID_BRUSH = QBrush(QColor("red"))
+
+
+@dataclass(frozen=True)
+class Column:
+    path: Tuple[str, ...]
+    field: FieldBase[Any, Any]
+
+    @property
+    def name(self) -> str:
+        return ".".join(self.path)
+
+
+def columns_of(form_class: Type[Form], prefix: Tuple[str, ...] = ()) -> Tuple[Column, ...]:
+    """Fields of form_class as columns, fields of sub-forms follow with dotted names"""
+    columns: List[Column] = []
+    for entry in form_class.schema.entries:
+        path = prefix + (entry.attribute_name,)
+        if entry.is_container:
+            columns.extend(columns_of(type(cast("Form", entry.declaration)), path))
+        else:
+            columns.append(Column(path, cast("FieldBase[Any, Any]", entry.declaration)))
+    return tuple(columns)
+
+
+def _lookup(records: Sequence[Mapping[str, Any]], path: Tuple[str, ...]) -> List[Any]:
+    """Value at path of each record, None where missing"""
+    if len(path) == 1:
+        return [record.get(path[0]) for record in records]
+    found: List[Any] = []
+    for record in records:
+        value: Any = record
+        try:
+            for key in path:
+                value = value[key]
+        except (KeyError, TypeError):
+            value = None
+        found.append(value)
+    return found
+
+
+def _as_list(values: Sequence[Any]) -> List[Any]:
+    """Python objects of a list or NumPy array, None for masked values"""
+    tolist = getattr(values, "tolist", None)
+    return tolist() if tolist is not None else list(values)
+
+
+class RecordTableModel(QAbstractTableModel):
+    """Records of one Form class, stored per column as text, converted value and validity"""
+
+    def __init__(self, form_class: Type[Form], parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self.columns = columns_of(form_class)
+        self._validators: List[Validator[Any, Any]] = [column.field.cached_validator() for column in self.columns]
+        self._texts: List[List[str]] = [[] for _ in self.columns]
+        self._values: List[List[Any]] = [[] for _ in self.columns]
+        self._valid: List[List[bool]] = [[] for _ in self.columns]
+        self._rows = 0
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:  # pylint: disable=C0103
+        return 0 if parent.isValid() else self._rows
+
+    def columnCount(self, parent: QModelIndex = QModelIndex()) -> int:  # pylint: disable=C0103
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index: QModelIndex, role: int = _DISPLAY_ROLE) -> Any:
+        if role in (_DISPLAY_ROLE, _EDIT_ROLE):
+            return self._texts[index.column()][index.row()]
+        if role == _FOREGROUND_ROLE and not self._valid[index.column()][index.row()]:
+            return _INVALID_BRUSH
+        return None
+
+    def headerData(  # pylint: disable=C0103
+        self, section: int, orientation: Qt.Orientation, role: int = _DISPLAY_ROLE
+    ) -> Any:
+        if role != _DISPLAY_ROLE:
+            return None
+        if orientation == Qt.Horizontal:
+            return self.columns[section].field.name
+        return str(section + 1)
+
+    def flags(self, index: QModelIndex) -> Qt.ItemFlags:
+        flags = super().flags(index)
+        if index.isValid() and not self.columns[index.column()].field.read_only:
+            flags |= Qt.ItemIsEditable
+        return flags
+
+    def setData(self, index: QModelIndex, value: Any, role: int = _EDIT_ROLE) -> bool:  # pylint: disable=C0103
+        """Store value if its field accepts it, other values are rejected"""
+        if role != _EDIT_ROLE or not index.isValid():
+            return False
+        column, row = index.column(), index.row()
+        validator = self._validators[column]
+        text = str(value)
+        if validator.validate(text).state != ValidatorResult.State.VALID:
+            return False
+        self._texts[column][row] = text
+        self._values[column][row] = validator.converted(text)
+        self._valid[column][row] = True
+        self.dataChanged.emit(index, index, [_DISPLAY_ROLE, _EDIT_ROLE])
+        return True
+
+    def set_records(self, records: Sequence[Mapping[str, Any]]) -> None:
+        """Replace all rows. Records are nested dicts like Form.as_dict, each column is validated in one batch"""
+        self.beginResetModel()
+        for texts, values, valid in zip(self._texts, self._values, self._valid):
+            texts.clear()
+            values.clear()
+            valid.clear()
+        self._rows = 0
+        self._extend(records)
+        self.endResetModel()
+
+    def append_records(self, records: Sequence[Mapping[str, Any]]) -> None:
+        if not records:
+            return
+        self.beginInsertRows(QModelIndex(), self._rows, self._rows + len(records) - 1)
+        self._extend(records)
+        self.endInsertRows()
+
+    def _extend(self, records: Sequence[Mapping[str, Any]]) -> None:
+        for column, validator, texts, values, valid in zip(
+            self.columns, self._validators, self._texts, self._values, self._valid
+        ):
+            new_texts = ["" if value is None else str(value) for value in _lookup(records, column.path)]
+            batch = validator.validate_many(new_texts)
+            texts.extend(new_texts)
+            values.extend(_as_list(batch.converted))
+            valid.extend(_as_list(batch.in_range))
+        self._rows += len(records)
+
+    def value(self, row: int, name: str) -> Any:
+        """Converted value of the column with dotted name"""
+        return self._values[self._column(name)][row]
+
+    def column_values(self, name: str) -> Sequence[Any]:
+        return self._values[self._column(name)]
+
+    def is_valid(self, row: int) -> bool:
+        return all(valid[row] for valid in self._valid)
+
+    def record(self, row: int) -> Dict[str, Any]:
+        """Converted values of row as nested dicts, like Form.as_dict"""
+        result: Dict[str, Any] = {}
+        for column, values in zip(self.columns, self._values):
+            target = result
+            for key in column.path[:-1]:
+                target = target.setdefault(key, {})
+            target[column.path[-1]] = values[row]
+        return result
+
+    def records(self) -> List[Dict[str, Any]]:
+        return [self.record(row) for row in range(self._rows)]
+
+    def _column(self, name: str) -> int:
+        for position, column in enumerate(self.columns):
+            if column.name == name:
+                return position
+        raise ValueError(f"No column {name}")
+
+
+class FieldDelegate(QStyledItemDelegate):
+    """Edits cells with the input widget of their field, created only while the cell is edited"""
+
+    def __init__(self, columns: Sequence[Column], parent: Optional[QObject] = None) -> None:
+        super().__init__(parent)
+        self.columns = columns
+
+    def createEditor(  # pylint: disable=C0103
+        self, parent: QWidget, option: QStyleOptionViewItem, index: QModelIndex  # pylint: disable=W0613
+    ) -> QWidget:
+        return self.columns[index.column()].field.create_editor(parent)
+
+    def setEditorData(self, editor: QWidget, index: QModelIndex) -> None:  # pylint: disable=C0103
+        cast("InputWidget[Any, Any]", editor).setText(index.data(_EDIT_ROLE))
+
+    def setModelData(  # pylint: disable=C0103
+        self, editor: QWidget, model: QAbstractItemModel, index: QModelIndex
+    ) -> None:
+        model.setData(index, cast("InputWidget[Any, Any]", editor).text(), _EDIT_ROLE)
+
+
+class TableForm:
+    """Many records of one Form class as rows of a table. Only the visible cells are painted
+    and only the edited cell has an editor, so rows cost a few strings each instead of widgets"""
+
+    def __init__(
+        self, form_class: Type[Form], records: Iterable[Mapping[str, Any]] = (), parent: Optional[QWidget] = None
+    ) -> None:
+        self.model = RecordTableModel(form_class)
+        self.view = QTableView(parent)
+        self.view.setModel(self.model)
+        self.view.setItemDelegate(FieldDelegate(self.model.columns, self.view))
+        self.view.setSelectionBehavior(QAbstractItemView.SelectItems)
+        # Fixed row heights keep the view from measuring rows
+        vertical = self.view.verticalHeader()
+        vertical.setSectionResizeMode(QHeaderView.Fixed)
+        vertical.setDefaultSectionSize(self.view.fontMetrics().height() + 8)
+        self.model.set_records(list(records))
+
+    def widget(self) -> QTableView:
+        return self.view
+
+    def show(self) -> None:
+        self.view.show()
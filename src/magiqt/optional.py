@@ -0,0 +1,19 @@
+"""Optional dependencies, imported on first use so importing MagiQt stays fast"""
+from typing import Any
+
+_NUMPY: Any = None
+_NUMPY_CHECKED = False
+
+
+def numpy() -> Any:
+    """The numpy module, None if it is not installed"""
+    global _NUMPY, _NUMPY_CHECKED  # pylint: disable=W0603
+    if not _NUMPY_CHECKED:
+        try:
+            import numpy as np  # pylint: disable=C0415
+
+            _NUMPY = np
+        except ImportError:  # pragma: no cover
+            _NUMPY = None
+        _NUMPY_CHECKED = True
+    return _NUMPY
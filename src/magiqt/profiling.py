@@ -0,0 +1,167 @@
+"""Timing and counts of form events, switched on at runtime with enable().
+
+Instrumented categories: "build" and "create_widgets" per form class, "on_change" per form class with the
+propagation depth. Per field, named form class.attribute: "validation" and "conversion" for each text parsed,
+"validation_hit" counts texts answered from the validator cache without timing them.
+Disabled spans cost a function call, hot paths check PROFILER.enabled first"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, asdict
+from time import perf_counter
+from typing import Any, ContextManager, Deque, Dict, Iterator, List, Optional, Tuple
+
+_NULL_SPAN: ContextManager[None] = nullcontext()
+
+
+@dataclass
+class Stat:
+    count: int = 0
+    total_s: float = 0.0
+    max_s: float = 0.0
+
+    @property
+    def mean_s(self) -> float:
+        return self.total_s / self.count if self.count else 0.0
+
+
+@dataclass(frozen=True)
+class Event:
+    category: str
+    name: str
+    start_s: float
+    duration_s: float
+    thread: int
+    args: Dict[str, Any]
+
+
+class Profiler:
+    def __init__(self) -> None:
+        self.enabled = False
+        self.trace = True
+        self.stats: Dict[Tuple[str, str], Stat] = {}
+        self.events: Deque[Event] = deque(maxlen=100_000)
+        self._origin = perf_counter()
+
+    def enable(self, trace: bool = True, max_events: int = 100_000) -> None:
+        """Start recording. With trace=False only counts and times are kept, not the last max_events events"""
+        self.trace = trace
+        if self.events.maxlen != max_events:
+            self.events = deque(self.events, maxlen=max_events)
+        self.enabled = True
+
+    def disable(self) -> None:
+        self.enabled = False
+
+    def reset(self) -> None:
+        self.stats.clear()
+        self.events.clear()
+        self._origin = perf_counter()
+
+    def span(self, category: str, name: str, **args: Any) -> ContextManager[None]:
+        if not self.enabled:
+            return _NULL_SPAN
+        return self._span(category, name, args)
+
+    @contextmanager
+    def _span(self, category: str, name: str, args: Dict[str, Any]) -> Iterator[None]:
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.record(category, name, start, perf_counter() - start, args)
+
+    def record(  # pylint: disable=R0913
+        self, category: str, name: str, start: float, duration: float, args: Dict[str, Any]
+    ) -> None:
+        entry = self.stats.get((category, name))
+        if entry is None:
+            entry = self.stats[(category, name)] = Stat()
+        entry.count += 1
+        entry.total_s += duration
+        entry.max_s = max(entry.max_s, duration)
+        if self.trace:
+            self.events.append(Event(category, name, start - self._origin, duration, threading.get_ident(), args))
+
+    def count(self, category: str, name: str) -> None:
+        """Count an occurrence that is not timed, kept out of the trace"""
+        entry = self.stats.get((category, name))
+        if entry is None:
+            entry = self.stats[(category, name)] = Stat()
+        entry.count += 1
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        """Stats by category and name, with mean_s"""
+        result: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for (category, name), entry in sorted(self.stats.items()):
+            result.setdefault(category, {})[name] = {**asdict(entry), "mean_s": entry.mean_s}
+        return result
+
+    def chrome_trace(self) -> Dict[str, List[Dict[str, Any]]]:
+        """Recorded events in Chrome trace event format, for chrome://tracing or Perfetto"""
+        pid = os.getpid()
+        return {
+            "traceEvents": [
+                {
+                    "name": event.name,
+                    "cat": event.category,
+                    "ph": "X",
+                    "ts": event.start_s * 1e6,
+                    "dur": event.duration_s * 1e6,
+                    "pid": pid,
+                    "tid": event.thread,
+                    "args": event.args,
+                }
+                for event in self.events
+            ]
+        }
+
+    def dump_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.summary(), file, indent=2)
+
+    def dump_chrome_trace(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.chrome_trace(), file, default=str)
+
+
+PROFILER = Profiler()
+
+
+def enable(trace: bool = True, max_events: int = 100_000) -> None:
+    PROFILER.enable(trace, max_events)
+
+
+def disable() -> None:
+    PROFILER.disable()
+
+
+def reset() -> None:
+    PROFILER.reset()
+
+
+def span(category: str, name: str, **args: Any) -> ContextManager[None]:
+    """Time the block as an event of category and name. Does nothing while profiling is disabled"""
+    if not PROFILER.enabled:
+        return _NULL_SPAN
+    return PROFILER.span(category, name, **args)
+
+
+def stat(category: str, name: str) -> Optional[Stat]:
+    return PROFILER.stats.get((category, name))
+
+
+def summary() -> Dict[str, Dict[str, Dict[str, float]]]:
+    return PROFILER.summary()
+
+
+def dump_json(path: str) -> None:
+    PROFILER.dump_json(path)
+
+
+def dump_chrome_trace(path: str) -> None:
+    PROFILER.dump_chrome_trace(path)
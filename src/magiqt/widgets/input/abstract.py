@@ -30,6 +30,9 @@ class InputWidget(IsEditable[_Converted], Generic[_Value, _Converted]):
     def text(self) -> str:
         raise NotImplementedError
 
+    def setText(self, text: str) -> None:  # pylint: disable=C0103
+        raise NotImplementedError
+
     def validator(self) -> QtValidatorWrapper[_Value, _Converted]:
         raise NotImplementedError
 
@@ -12,17 +12,57 @@ from magiqt.widgets.input.wrappers import QtValidatorWrapper
 if TYPE_CHECKING:
     from magiqt.field.fields import FieldBase
 
+_DISPLAY_ROLE = Qt.DisplayRole
+_MEASURED_ITEMS = 1000
+
 
 class QtModelWrapper(QAbstractListModel, Generic[_Converted]):
     def __init__(self, range_: ItemRange[_Converted], parent: Optional[QWidget] = None):
         super().__init__(parent)
         self._range = range_
+        if len(range_) == 0 and range_.can_fetch_more():
+            range_.fetch_more()
+        # Qt calls data() and rowCount() for every row when sizing the popup, so keep them to a single lookup
+        self._display_role = range_.display_role
+        self._row_count = len(range_)
+        # Validating values of lazy ranges loads items outside the model
+        range_.on_fetch(self._sync_rows)
+
+    @property
+    def range(self) -> ItemRange[_Converted]:
+        return self._range
 
     def data(self, index: QModelIndex, role: int = -1) -> Union[str, _Converted, None]:
-        return self._range.display_role(index.row()) if role == Qt.DisplayRole else None
+        return self._display_role(index.row()) if role == _DISPLAY_ROLE else None
 
     def rowCount(self, parent: Optional[QModelIndex] = None) -> int:  # pylint: disable=W0613, C0103
-        return len(self._range)
+        return self._row_count
+
+    def canFetchMore(self, parent: QModelIndex) -> bool:  # pylint: disable=C0103
+        return not parent.isValid() and self._range.can_fetch_more()
+
+    def fetchMore(self, parent: QModelIndex) -> None:  # pylint: disable=C0103
+        if parent.isValid():
+            return
+        self._range.fetch_more()
+        self._sync_rows()
+
+    def _sync_rows(self) -> None:
+        rows = len(self._range)
+        if rows <= self._row_count:
+            return
+        self.beginInsertRows(QModelIndex(), self._row_count, rows - 1)
+        self._row_count = rows
+        self.endInsertRows()
+
+    def row_of(self, text: str) -> int:
+        try:
+            row = self._range.index_of(text)
+        except ValueError:
+            return -1
+        # Looking up a value of a lazy range may have loaded more rows
+        self._sync_rows()
+        return row
 
 
 class ComboBox(QComboBox, InputWidget[_Value, _Converted]):
@@ -30,13 +70,21 @@ class ComboBox(QComboBox, InputWidget[_Value, _Converted]):
 
     def __init__(self, field: FieldBase[_Value, _Converted], parent: Optional[QWidget] = None) -> None:
         super().__init__(parent)
+        # All rows share one height, so the view does not have to measure every item of large ranges
+        self.view().setUniformItemSizes(True)  # type: ignore
         self.set_field(field)
 
     def set_validator(self, field: FieldBase[_Value, _Converted]) -> None:
-        self._validator = field.validator(field.range)
+        self._validator = field.cached_validator()
 
     def set_range(self, range_: ItemRange[_Converted]) -> None:  # type: ignore
         self.setModel(QtModelWrapper(range_))
+        if len(range_) > _MEASURED_ITEMS or range_.can_fetch_more():
+            # Sizing to contents measures the text of every item, estimate the width from the first ones instead
+            measured = range(min(len(range_), _MEASURED_ITEMS))
+            longest = max((len(range_.display_role(row)) for row in measured), default=0)
+            self.setSizeAdjustPolicy(QComboBox.AdjustToMinimumContentsLengthWithIcon)
+            self.setMinimumContentsLength(longest)
 
     def set_readonly(self, state: bool) -> None:
         self.setEnabled(not state)
@@ -47,6 +95,9 @@ class ComboBox(QComboBox, InputWidget[_Value, _Converted]):
     def text(self) -> str:
         return self.currentText()
 
+    def setText(self, text: str) -> None:  # pylint: disable=C0103
+        self.setCurrentIndex(self.model().row_of(text))
+
     def widget(self) -> ComboBox[_Value, _Converted]:
         return self
 
@@ -54,11 +105,13 @@ class ComboBox(QComboBox, InputWidget[_Value, _Converted]):
         return 1
 
     def model(self) -> QtModelWrapper[_Converted]:
-        return self.model()
+        return super().model()  # type: ignore
 
     def converted(self) -> Optional[_Converted]:
-        validator: Validator[_Value, _Converted] = self.validator().wrapped
-        return validator.converted(self.text())
+        row = self.currentIndex()
+        if row < 0:
+            return None
+        return self.model().range.item(row)
 
     def __repr__(self) -> str:
         return f"{type(self).__name__}(text={self.text()!r})"
@@ -0,0 +1,119 @@
+from __future__ import annotations
+from array import array
+from bisect import bisect_right
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import accumulate
+from threading import Lock
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Any, Union
+from weakref import finalize
+
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtBoundSignal
+
+from magiqt.interface import Range
+
+DEFAULT_LIMIT = 200
+_SEPARATOR = "\0"
+
+
+class CompletionIndex:
+    """Case-insensitive substring search. Items are casefolded into one string searched with str.find"""
+
+    def __init__(self, items: Sequence[str]) -> None:
+        self.items = tuple(items)
+        folded = [item.casefold().replace(_SEPARATOR, "") for item in self.items]
+        self._corpus = _SEPARATOR.join(folded)
+        self._starts = array("q", accumulate((len(text) + 1 for text in folded), initial=0))
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def search(self, text: str, limit: int, is_stale: Callable[[], bool] = lambda: False) -> Optional[List[str]]:
+        """Items containing text, in range order. Returns None if the query went stale while searching"""
+        if not text:
+            return list(self.items[:limit])
+        needle = text.casefold()
+        if _SEPARATOR in needle:
+            return []
+        find, starts, items = self._corpus.find, self._starts, self.items
+        found: List[str] = []
+        position = 0
+        while len(found) < limit:
+            hit = find(needle, position)
+            if hit < 0:
+                break
+            if is_stale():
+                return None
+            row = bisect_right(starts, hit) - 1
+            found.append(items[row])
+            # Continue from the next item, one match per item is enough
+            position = starts[row + 1]
+        return found
+
+
+_INDEXES: Dict[int, Tuple[int, CompletionIndex]] = {}
+_INDEXES_LOCK = Lock()
+
+
+def completion_index(range_: Range[Any, Any]) -> CompletionIndex:
+    """Index of range_.gui_items(), built once per range and rebuilt only if the items grew"""
+    key = id(range_)
+    items = range_.gui_items()
+    with _INDEXES_LOCK:
+        cached = _INDEXES.get(key)
+        if cached is not None and cached[0] == len(items):
+            return cached[1]
+    index = CompletionIndex(items)
+    with _INDEXES_LOCK:
+        if key not in _INDEXES:
+            finalize(range_, _INDEXES.pop, key, None)
+        _INDEXES[key] = (len(items), index)
+    return index
+
+
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _EXECUTOR  # pylint: disable=W0603
+    if _EXECUTOR is None:
+        _EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="magiqt-completion")
+    return _EXECUTOR
+
+
+class CompletionEngine(QObject):
+    """Runs completion queries in a worker thread. Only the result of the latest query is delivered"""
+
+    finished: Union[pyqtSignal, pyqtBoundSignal] = pyqtSignal(int, list)
+    completed: Union[pyqtSignal, pyqtBoundSignal] = pyqtSignal(list)
+
+    def __init__(self, range_: Range[Any, Any], limit: int = DEFAULT_LIMIT, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.range = range_
+        self.limit = limit
+        self._generation = 0
+        self._pending: Optional[Future[None]] = None
+        self.finished.connect(self._deliver)
+
+    def query(self, text: str) -> None:
+        self._generation += 1
+        if self._pending is not None:
+            self._pending.cancel()
+        self._pending = _executor().submit(self._search, self._generation, text)
+
+    def _is_stale(self, generation: int) -> bool:
+        return generation != self._generation
+
+    def _search(self, generation: int, text: str) -> None:
+        if self._is_stale(generation):
+            return
+        found = completion_index(self.range).search(text, self.limit, lambda: self._is_stale(generation))
+        if found is None:
+            return
+        try:
+            self.finished.emit(generation, found)
+        except RuntimeError:  # The widget was deleted while searching
+            pass
+
+    def _deliver(self, generation: int, found: List[str]) -> None:
+        if not self._is_stale(generation):
+            self.completed.emit(found)
@@ -8,7 +8,7 @@ from typing import (
 
 from PyQt5.QtGui import QKeyEvent
 from PyQt5.QtCore import Qt
-from PyQt5.QtWidgets import QLineEdit, QWidget, QCompleter
+from PyQt5.QtWidgets import QLineEdit, QWidget
 
 from magiqt.interface import (
     Validator,
@@ -33,22 +33,22 @@ class LineEdit(QLineEdit, InputWidget[_Value, _Converted], Generic[_Value, _Conv
         return self
 
     def set_validator(self, field: FieldBase[_Value, _Converted]) -> None:
-        validator = field.validator(field.range)
-        self.setValidator(QtValidatorWrapper(self, validator))
+        self.setValidator(QtValidatorWrapper(self, field.cached_validator()))
 
     def set_range(self, range_: Range[_Value, _Converted]) -> None:
-        self.setCompleter(QtCompleterWrapper(self, range_))
+        # Only ranges with items have something to complete
+        if range_.is_mapping():
+            self.setCompleter(QtCompleterWrapper(self, range_))
+        elif self.completer() is not None:
+            self.setCompleter(None)  # type: ignore
 
     def set_readonly(self, state: bool) -> None:
         self.setReadOnly(state)
 
     def keyPressEvent(self, key_event: QKeyEvent) -> None:  # pylint: disable=C0103
         super().keyPressEvent(key_event)
-        if key_event.key() == Qt.Key_Down:
-            if self.text() == "":
-                self.completer().setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        if key_event.key() == Qt.Key_Down and self.completer() is not None:
             self.completer().complete()
-            self.completer().setCompletionMode(QCompleter.PopupCompletion)
 
     def validator(self) -> QtValidatorWrapper[_Value, _Converted]:
         return super().validator()  # type: ignore
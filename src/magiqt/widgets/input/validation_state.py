@@ -0,0 +1,86 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+from PyQt5.QtGui import QColor, QPalette
+from PyQt5.QtWidgets import QWidget
+
+from magiqt.interface import ValidatorResult
+
+_State = ValidatorResult.State
+
+
+@dataclass(frozen=True)
+class ValidationTheme:
+    """Colors of input text per validation state"""
+
+    valid: str = "black"
+    intermediate: str = "red"
+    invalid: str = "red"
+    role: QPalette.ColorRole = QPalette.Text
+
+    def color(self, state: ValidatorResult.State) -> str:
+        if state is _State.VALID:
+            return self.valid
+        if state is _State.INTERMEDIATE:
+            return self.intermediate
+        return self.invalid
+
+
+class StateRenderer:
+    """Styles input widgets by validation state. Colors are built once per theme and state and set on the
+    palette of the widget itself, so palettes set on single widgets are kept. A widget is restyled only when its
+    state or the theme changes"""
+
+    def __init__(self, theme: ValidationTheme = ValidationTheme()) -> None:
+        self._theme = theme
+        self._generation = 0
+        self._colors: Dict[_State, QColor] = {}
+        self._states: WeakKeyDictionary[QWidget, Tuple[int, _State]] = WeakKeyDictionary()
+
+    @property
+    def theme(self) -> ValidationTheme:
+        return self._theme
+
+    @theme.setter
+    def theme(self, theme: ValidationTheme) -> None:
+        self._theme = theme
+        self._generation += 1
+        self._colors.clear()
+
+    def state(self, widget: QWidget) -> Optional[ValidatorResult.State]:
+        styled = self._states.get(widget)
+        return None if styled is None else styled[1]
+
+    def render(self, widget: QWidget, state: ValidatorResult.State) -> bool:
+        """Style widget for state. Returns False if it already was"""
+        styled = (self._generation, state)
+        if self._states.get(widget) == styled:
+            return False
+        palette = widget.palette()
+        palette.setColor(self._theme.role, self._color(state))
+        widget.setPalette(palette)
+        self._states[widget] = styled
+        return True
+
+    def _color(self, state: ValidatorResult.State) -> QColor:
+        color = self._colors.get(state)
+        if color is None:
+            color = self._colors[state] = QColor(self._theme.color(state))
+        return color
+
+
+_RENDERER: Optional[StateRenderer] = None
+
+
+def renderer() -> StateRenderer:
+    global _RENDERER  # pylint: disable=W0603
+    if _RENDERER is None:
+        _RENDERER = StateRenderer()
+    return _RENDERER
+
+
+def set_theme(theme: ValidationTheme) -> None:
+    """Use theme for all input widgets. Widgets are restyled on their next validation"""
+    renderer().theme = theme
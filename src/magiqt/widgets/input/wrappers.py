@@ -1,46 +1,53 @@
 from __future__ import annotations
-from contextlib import contextmanager
-from typing import Optional, Iterator, Generic, Dict, Tuple, TYPE_CHECKING, Union
+from typing import Optional, Generic, Dict, Tuple, TYPE_CHECKING, Union, List
 
-from PyQt5.QtCore import Qt, QRect
-from PyQt5.QtGui import QValidator, QPalette, QColor
+from PyQt5.QtCore import Qt, QRect, QStringListModel
+from PyQt5.QtGui import QValidator
 from PyQt5.QtWidgets import QCompleter, QLineEdit, QComboBox
 
 from magiqt.interface import Range, _Value, _Converted, ValidatorResult, Validator
+from magiqt.widgets.input.completion import CompletionEngine, DEFAULT_LIMIT
+from magiqt.widgets.input.validation_state import renderer
 
 if TYPE_CHECKING:
     from magiqt.widgets.input.line_edit import LineEdit
 
 
 class QtCompleterWrapper(QCompleter):
-    def __init__(self, parent: QLineEdit, range_: Range[_Value, _Converted]):
+    """Completer whose model holds only the matches of the latest query, filtered by a CompletionEngine"""
+
+    def __init__(self, parent: QLineEdit, range_: Range[_Value, _Converted], limit: int = DEFAULT_LIMIT):
         self.range = range_
         self.connected_to = parent
-        super().__init__(range_.gui_items(), parent)
+        super().__init__(parent)
+        self.setModel(QStringListModel(self))
         self.setCaseSensitivity(Qt.CaseInsensitive)
-        self.setFilterMode(Qt.MatchContains)
+        self.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self._rect: Optional[QRect] = None
+        self.engine = CompletionEngine(range_, limit, self)
+        self.engine.completed.connect(self._show_matches)
+        if range_.is_mapping():
+            parent.textEdited.connect(self.engine.query)
 
     def complete(self, rect: Optional[QRect] = None) -> None:
         if not self.range.is_mapping():
             return None
-        with self._handle_empty_textbox():
-            if rect is None:
-                super().complete()
-            else:
-                super().complete(rect)
+        self._rect = rect
+        self.engine.query(self.connected_to.text())
         return None
 
-    @contextmanager
-    def _handle_empty_textbox(self) -> Iterator[None]:
-        if self.connected_to.text() != "":
-            yield None
+    def matches(self) -> List[str]:
+        return self.model().stringList()  # type: ignore
+
+    def _show_matches(self, found: List[str]) -> None:
+        self.model().setStringList(found)  # type: ignore
+        if not found or not self.connected_to.hasFocus():
+            self.popup().hide()
             return
-        self.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
-        try:
-            yield None
-        finally:
-            self.setCompletionMode(QCompleter.PopupCompletion)
-        return
+        if self._rect is None:
+            super().complete()
+        else:
+            super().complete(self._rect)
 
 
 class QtValidatorWrapper(QValidator, Generic[_Value, _Converted]):
@@ -61,12 +68,7 @@ class QtValidatorWrapper(QValidator, Generic[_Value, _Converted]):
 
     def validate(self, value: str, position: int) -> Tuple["QValidator.State", str, int]:
         validated = self.wrapped.validate(value)
-        palette = self.connected_to.palette()
-        if validated.state is ValidatorResult.State.VALID:
-            palette.setColor(QPalette.Text, QColor("black"))
-        else:
-            palette.setColor(QPalette.Text, QColor("red"))
-        self.connected_to.setPalette(palette)
+        renderer().render(self.connected_to, validated.state)
         state, value = self.parse_result(validated)
         return state, value, position
 
@@ -0,0 +1,12 @@
+from PyQt5.QtWidgets import QComboBox
+from magiqt.interface import IsPlaceable
+
+
+class UnitBox(QComboBox, IsPlaceable):  # pylint: disable=W0223
+    """Selects the unit a quantity is shown in"""
+
+    def span(self) -> int:
+        return 1
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(unit={self.currentText()!r})"
@@ -1,2 +1,3 @@
 from unit_system.abstract import UnitBase
 from unit_system.quantity import QuantityType, Unitless, Pressure, Area, Force
+from unit_system.array import QuantityArray
@@ -1,4 +1,4 @@
-from typing import Generic, TypeVar
+from typing import Generic, Optional, Tuple, TypeVar
 from dataclasses import dataclass
 
 
@@ -9,8 +9,16 @@ _T = TypeVar("_T")
 class UnitBase(Generic[_T]):
     name: str
 
+    def __hash__(self) -> int:
+        # Units are dictionary keys of conversions, the name is enough and its hash is cached by str
+        return hash(self.name)
+
     def to_base(self, value: _T) -> _T:  # pylint: disable=R0201
         return value
 
     def from_base(self, value: _T) -> _T:  # pylint: disable=R0201
         return value
+
+    def affine(self) -> Optional[Tuple[float, float]]:  # pylint: disable=R0201
+        """Multiplier and addend of to_base, None if it is not known to be affine"""
+        return None
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Optional, Union
+
+from unit_system.abstract import UnitBase
+from unit_system.quantity import QuantityType
+
+
+@dataclass
+class _Buffer:
+    data: Any
+    unit: str
+
+
+class QuantityArray:
+    """NumPy array of values of a quantity tagged with their unit. to() is lazy, values are converted when read,
+    in one pass with the fused transform of the unit pair. convert() converts the array in place.
+    Arrays returned by to() share the data and stay correct after an in place conversion"""
+
+    def __init__(self, values: Any, quantity: QuantityType[Any], unit: Union[str, UnitBase[Any]]) -> None:
+        self.quantity = quantity
+        self.unit = quantity[unit].name
+        self._buffer = _Buffer(values, self.unit)
+
+    @property
+    def values(self) -> Any:
+        """The data itself when it is in this unit, otherwise a converted copy"""
+        if self._buffer.unit == self.unit:
+            return self._buffer.data
+        return self.quantity.convert_array(self._buffer.data, self._buffer.unit, self.unit)
+
+    def to(self, unit: Union[str, UnitBase[Any]]) -> QuantityArray:
+        """The same values in unit, without converting them yet"""
+        view = QuantityArray.__new__(QuantityArray)
+        view.quantity = self.quantity
+        view.unit = self.quantity[unit].name
+        view._buffer = self._buffer  # pylint: disable=W0212
+        return view
+
+    def convert(self, unit: Union[str, UnitBase[Any]]) -> None:
+        """Convert the data to unit in place. The data must have a floating point dtype"""
+        name = self.quantity[unit].name
+        buffer = self._buffer
+        if buffer.unit != name:
+            self.quantity.convert_array(buffer.data, buffer.unit, name, out=buffer.data)
+            buffer.unit = name
+        self.unit = name
+
+    def __array__(self, dtype: Optional[Any] = None) -> Any:
+        values = self.values
+        return values if dtype is None else values.astype(dtype)
+
+    def __len__(self) -> int:
+        return len(self._buffer.data)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.values!r}, {self.quantity.name}, {self.unit!r})"
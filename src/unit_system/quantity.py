@@ -1,43 +1,134 @@
-from dataclasses import dataclass
-from typing import Union, Sequence, Generic
+import sys
+from dataclasses import dataclass, field
+from typing import Any, Union, Sequence, Generic, Callable, Dict, Optional, Tuple, overload
 
 from unit_system.unit import Unit
 from unit_system.abstract import UnitBase, _T
 
 
+# Unit given by name or as the unit itself
+UnitKey = Union[str, UnitBase[_T]]
+
+
 @dataclass(init=False)
-class QuantityType(Generic[_T]):
+class QuantityType(Generic[_T]):  # pylint: disable=R0902
     name: str
     units: Sequence[UnitBase[_T]]
+    # Units by interned name
+    _index: Dict[str, UnitBase[_T]] = field(repr=False, compare=False)
+    # Both caches are keyed by the units as passed, names or units
+    _converters: Dict[Tuple[Any, Any], Callable[[_T], _T]] = field(repr=False, compare=False)
+    _transforms: Dict[Tuple[Any, Any], Optional[Tuple[float, float]]] = field(repr=False, compare=False)
+    _hash: int = field(repr=False, compare=False)
 
     def __init__(self, name: str, *units: UnitBase[_T]):
         self.name = name
         self.units = tuple(units)
+        self._index = {}
+        for unit in self.units:
+            if unit.name in self._index:
+                raise ValueError(f"{name} has more than one unit named {unit.name}")
+            self._index[sys.intern(unit.name)] = unit
+        self._converters = {}
+        self._transforms = {}
+        self._hash = hash((self.name, self.units))
 
     def __hash__(self) -> int:
-        return id(self.name) | id(self.units)
-
-    def convert(
-        self,
-        value: _T,
-        from_unit: Union[str, UnitBase[_T]],
-        to_unit: Union[str, UnitBase[_T]],
-    ) -> _T:
-        start_unit = self[from_unit]
-        end_unit = self[to_unit]
-        base = start_unit.to_base(value)
-        return end_unit.from_base(base)
-
-    def __getitem__(self, index: Union[str, UnitBase[_T]]) -> UnitBase[_T]:
+        return self._hash
+
+    @overload
+    def convert(self, value: _T, from_unit: UnitKey[_T], to_unit: UnitKey[_T]) -> _T:
+        ...
+
+    @overload
+    def convert(self, value: Any, from_unit: UnitKey[_T], to_unit: UnitKey[_T]) -> Any:
+        ...
+
+    def convert(self, value: Any, from_unit: UnitKey[_T], to_unit: UnitKey[_T]) -> Any:
+        """Converts a value, or all values of a NumPy array with convert_array"""
+        if not isinstance(value, (int, float)) and hasattr(value, "__array__"):
+            return self.convert_array(value, from_unit, to_unit)
+        converter = self._converters.get((from_unit, to_unit))
+        if converter is None:
+            converter = self.converter(from_unit, to_unit)
+        return converter(value)
+
+    def convert_array(self, values: Any, from_unit: UnitKey[_T], to_unit: UnitKey[_T], out: Any = None) -> Any:
+        """Values of a NumPy array converted with one multiplication and one addition per element, see transform.
+        Writes into out if given, which may be values itself, and returns it. Units that are not affine are
+        converted with from_base(to_base(values))"""
+        transform = self.transform(from_unit, to_unit)
+        if transform is None:
+            converted = self[to_unit].from_base(self[from_unit].to_base(values))
+            if out is None:
+                return converted
+            out[...] = converted
+            return out
+        scale, offset = transform
+        if out is None:
+            out = values * scale
+        elif out is values:
+            out *= scale
+        else:
+            out[...] = values
+            out *= scale
+        if offset:
+            out += offset
+        return out
+
+    def transform(self, from_unit: UnitKey[_T], to_unit: UnitKey[_T]) -> Optional[Tuple[float, float]]:
+        """Scale and offset converting from_unit to_unit in one step, None if a unit is not affine.
+        The result may differ from from_base(to_base(value)) in the last digit, since it rounds once less"""
+        key = (from_unit, to_unit)
         try:
-            if isinstance(index, str):
-                return next(u for u in self.units if u.name == index)
-            self.units.index(index)
-            return index
-        except (IndexError, StopIteration):
-            raise ValueError(f"{index} is not a valid unit") from None
-
-    def __contains__(self, item: Union[str, UnitBase[_T]]) -> bool:
+            return self._transforms[key]
+        except KeyError:
+            pass
+        start_unit, end_unit = self[from_unit], self[to_unit]
+        names = (start_unit.name, end_unit.name)
+        if names not in self._transforms:
+            start, end = start_unit.affine(), end_unit.affine()
+            transform = None
+            if start is not None and end is not None:
+                # to_base is m * x + a and from_base is (y - a) / m
+                transform = (start[0] / end[0], (start[1] - end[1]) / end[0])
+            self._transforms[names] = transform
+        self._transforms[key] = self._transforms[names]
+        return self._transforms[key]
+
+    def converter(self, from_unit: UnitKey[_T], to_unit: UnitKey[_T]) -> Callable[[_T], _T]:
+        """Function converting values from_unit to_unit, created once per pair. Affine units are converted
+        with the precomposed scale * value + offset of transform"""
+        key = (from_unit, to_unit)
+        converter = self._converters.get(key)
+        if converter is not None:
+            return converter
+        start_unit, end_unit = self[from_unit], self[to_unit]
+        names = (start_unit.name, end_unit.name)
+        converter = self._converters.get(names)
+        if converter is None:
+            transform = self.transform(start_unit.name, end_unit.name)
+            if start_unit == end_unit or transform == (1, 0):
+                converter = _identity
+            elif transform is not None:
+                converter = _affine(*transform)
+            else:
+
+                def _converted(value: _T) -> _T:
+                    return end_unit.from_base(start_unit.to_base(value))
+
+                converter = _converted
+            self._converters[names] = converter
+        self._converters[key] = converter
+        return converter
+
+    def __getitem__(self, index: UnitKey[_T]) -> UnitBase[_T]:
+        unit = self._index.get(index if isinstance(index, str) else getattr(index, "name", None))  # type: ignore
+        if unit is None or not (isinstance(index, str) or unit is index or unit == index):
+            raise ValueError(f"{index} is not a valid unit")
+        return unit
+
+    def __contains__(self, item: UnitKey[_T]) -> bool:
         try:
             _ = self.__getitem__(item)
             return True
@@ -48,6 +139,17 @@ class QuantityType(Generic[_T]):
         return f"{type(self).__name__}(name={self.name}, *units={self.units})"
 
 
+def _identity(value: _T) -> _T:
+    return value
+
+
+def _affine(scale: float, offset: float) -> Callable[[Any], Any]:
+    def _converted(value: Any) -> Any:
+        return scale * value + offset
+
+    return _converted
+
+
 Unitless = QuantityType(
     "Unitless",
     Unit("-"),
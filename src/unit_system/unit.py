@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Tuple
 
 from unit_system.abstract import UnitBase
 
@@ -8,8 +9,13 @@ class Unit(UnitBase[float]):
     convert_to_base_multiplier: float = 1
     convert_to_base_add: float = 0
 
+    __hash__ = UnitBase.__hash__
+
     def to_base(self, value: float) -> float:
         return self.convert_to_base_multiplier * value + self.convert_to_base_add
 
     def from_base(self, value: float) -> float:
         return (value - self.convert_to_base_add) / self.convert_to_base_multiplier
+
+    def affine(self) -> Tuple[float, float]:
+        return self.convert_to_base_multiplier, self.convert_to_base_add
@@ -0,0 +1,36 @@
+from PyQt5.QtCore import QModelIndex
+
+from magiqt.field.fields import DropDown
+from magiqt.field.range import LazyRange, MappedRange
+from magiqt.widgets.input.combo_box import ComboBox
+
+
+def test_set_text_selects_row(app):
+    combo = ComboBox(DropDown("Part", range=MappedRange({f"PN-{i}": i for i in range(5000)})))
+    combo.setText("PN-4321")
+    assert combo.currentIndex() == 4321
+    assert combo.converted() == 4321
+    assert combo.model().rowCount() == 5000
+    combo.setText("missing")
+    assert combo.currentIndex() == -1
+
+
+def test_lazy_range_rows_are_fetched_in_chunks(app):
+    range_ = LazyRange.from_iterable((f"row{i}" for i in range(1000)), page_size=100)
+    combo = ComboBox(DropDown("Lazy", range=range_))
+    model = combo.model()
+    assert model.rowCount() == 100 and combo.currentText() == "row0"
+    assert model.canFetchMore(QModelIndex())
+    model.fetchMore(QModelIndex())
+    assert model.rowCount() == 200
+    combo.setText("row550")
+    assert combo.currentIndex() == 550 and model.rowCount() == 600
+
+
+def test_rows_loaded_by_validation_are_inserted(app):
+    range_ = LazyRange.from_iterable((f"row{i}" for i in range(1000)), page_size=100)
+    model = ComboBox(DropDown("Lazy", range=range_)).model()
+    inserted = []
+    model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+    assert "row250" in range_
+    assert model.rowCount() == 300 and inserted == [(100, 199), (200, 299)]
@@ -0,0 +1,28 @@
+import time
+
+from magiqt.field.fields import StringField
+from magiqt.field.range import ListRange
+from magiqt.widgets.input.completion import CompletionIndex
+from magiqt.widgets.input.line_edit import LineEdit
+
+
+def test_index_search_is_case_insensitive_and_limited():
+    index = CompletionIndex(["Pro", "Average", "Total failure", "prolog", "PROFIT"])
+    assert index.search("PRO", 10) == ["Pro", "prolog", "PROFIT"]
+    assert index.search("ro", 2) == ["Pro", "prolog"]
+    assert index.search("", 2) == ["Pro", "Average"]
+    assert index.search("ure", 10) == ["Total failure"]
+    assert index.search("eP", 10) == []
+    assert index.search("ro", 10, is_stale=lambda: True) is None
+
+
+def test_line_edit_completes_in_background(app):
+    field = StringField("Part", range=ListRange([f"part-{i}" for i in range(100_000)]))
+    line_edit = LineEdit(field)
+    completer = line_edit.completer()
+    completer.engine.query("part-1")
+    completer.engine.query("part-9999")
+    deadline = time.monotonic() + 5
+    while not completer.matches() and time.monotonic() < deadline:
+        app.processEvents()
+    assert completer.matches() == ["part-9999"] + [f"part-9999{i}" for i in range(10)]
@@ -0,0 +1,82 @@
+import pytest
+from PyQt5.QtTest import QTest
+
+from magiqt.field.fields import ComputedField, FloatField, IntegerField
+from magiqt.layout_manager.form import Form
+
+CALLS = []
+
+
+def _total(price, count):
+    CALLS.append("total")
+    return price * count
+
+
+class Order(Form):
+    price = FloatField("Price")
+    count = IntegerField("Count")
+    total = ComputedField("Total", inputs=("price", "count"), function=_total)
+
+
+class Invoice(Form):
+    order = Order("Order")
+    rate = FloatField("Tax rate")
+    tax = ComputedField("Tax", inputs=("order.total", "rate"), function=lambda total, rate: total * rate)
+    gross = ComputedField("Gross", inputs=("order.total", "tax"), function=lambda total, tax: total + tax)
+    per_item = ComputedField("Per item", inputs=("gross", "order.count"), function=lambda gross, count: gross / count)
+
+
+def test_changes_recompute_downstream_fields(app):
+    form = Invoice.build("Invoice")
+    assert form.order.total is None and form.gross is None
+    form.set_from_dict({"order": {"price": 10, "count": 4}, "rate": 0.5})
+    assert (form.order.total, form.tax, form.gross, form.per_item) == (40, 20, 60, 15)
+
+    CALLS.clear()
+    form.rate = 0.5
+    form.order.count = 4
+    assert not CALLS
+    QTest.keyClicks(form.node.children["rate"].widgets[1], "0")
+    assert form.gross == 60 and not CALLS
+    form.order.count = 0
+    assert form.order.total == 0 and form.per_item is None
+    assert form.node.children["gross"].widgets[1].text() == "0.0"
+    assert form.as_dict()["order"] == {"price": 10.0, "count": 0, "total": 0.0}
+
+    with pytest.raises(ValueError):
+        form.tax = 1
+    form.set_from_dict(form.as_dict())
+    restored = Invoice.build("Restored", headless=True)
+    restored.restore(form.snapshot())
+    assert restored.as_dict() == form.as_dict()
+
+
+def test_graph_is_sorted_when_the_class_is_defined():
+    assert Invoice.dependencies.order == ("tax", "gross", "per_item")
+    assert Invoice.dependencies.downstream[("rate",)] == ("tax", "gross", "per_item")
+    assert Invoice.dependencies.downstream[("order", "count")] == ("per_item",)
+    assert ("order", "price") not in Invoice.dependencies.downstream
+
+
+def test_cycles_and_unknown_inputs_fail_when_the_class_is_defined():
+    with pytest.raises(ValueError, match="a -> b -> a"):
+
+        class Cycle(Form):  # pylint: disable=W0612
+            a = ComputedField("A", inputs=("b",), function=abs)
+            b = ComputedField("B", inputs=("a",), function=abs)
+
+    with pytest.raises(ValueError, match="not declared"):
+
+        class Unknown(Form):  # pylint: disable=W0612
+            a = ComputedField("A", inputs=("order.missing",), function=abs)
+            order = Order("Order")
+
+
+def test_sub_form_restore_updates_parent_fields():
+    form = Invoice.build("Invoice", headless=True)
+    form.set_from_dict({"order": {"price": 5, "count": 5}, "rate": 1})
+    snapshot = form.order.snapshot()
+    form.order.set_from_dict({"price": 2, "count": 3})
+    assert form.gross == 12
+    form.order.restore(snapshot)
+    assert (form.order.total, form.tax, form.gross, form.per_item) == (25, 25, 50, 10)
@@ -0,0 +1,361 @@
+import asyncio
+import io
+import pickle
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+from PyQt5.QtCore import QTimer
+from PyQt5.QtTest import QTest
+
+from magiqt.field import validator
+from magiqt.field.fields import FloatField, IntegerField, StringField
+from magiqt.field.range import FloatRange
+from magiqt.layout_manager.background import FrozenForm, runner
+from magiqt.layout_manager.form import Form
+from magiqt.layout_manager.snapshot import decode, decode_file, encode
+from magiqt.main import TestForm
+
+
+def test_sub_form_handles_are_cached(app):
+    form = TestForm.build("Test")
+    assert form.config is form.config
+    assert form.config.employee is form.config.employee
+    assert form.config is not form.config2
+    form.config.employee.number = 5
+    form.config2.pipes = 3
+    assert form.config.employee.number == 5
+    assert form.as_dict()["config2"]["pipes"] == 3
+
+
+def test_field_values_are_stored_typed(app):
+    form = TestForm.build("Test")
+    mass_edit = form.node.children["mass"].widgets[1]
+    QTest.keyClicks(mass_edit, "12.5")
+    assert form.mass == 12.5
+    mass_edit.converted = None  # reads must not parse the widget text again
+    assert form.mass == 12.5 and form.as_dict()["mass"] == 12.5
+    form.combo = "test3"
+    form.price = 10
+    assert (form.combo, form.price, form.name) == ("test3", 10.0, "")
+
+
+def test_schema_includes_inherited_fields(app):
+    class Base(Form):
+        first = IntegerField("First")
+        second = FloatField("Second")
+
+    class Derived(Base):
+        third = StringField("Third")
+        second = IntegerField("Second as integer")
+
+    assert [entry.attribute_name for entry in Derived.schema.entries] == ["first", "second", "third"]
+    assert Derived.schema.entries[1].declaration is Derived.second
+    assert [entry.attribute_name for entry in TestForm.schema.sub_forms] == ["config", "config2"]
+    form = Derived.build("Derived")
+    form.first = 1
+    form.second = 2
+    assert form.as_dict() == {"first": 1, "second": 2, "third": ""}
+
+
+def test_lazy_sub_forms_buffer_values_until_materialized(app):
+    form = TestForm.build("Lazy", lazy=True)
+    config = form.node.children["config"]
+    assert config.widgets and not config.children["pipes"].widgets
+    form.config.pipes = 5
+    form.config.employee.level = "Pro"
+    assert form.config.pipes == 5 and form.config.welds is None
+    assert form.as_dict()["config"]["employee"] == {"number": None, "level": "Pro"}
+
+    config.widgets[0].setChecked(True)
+    assert config.children["pipes"].widgets[1].text() == "5"
+    assert not config.children["employee"].children["level"].widgets
+
+    form.config.employee.materialize()
+    assert config.children["employee"].children["level"].widgets[1].text() == "Pro"
+    assert form.config.employee.level == "Pro"
+    assert not form.node.children["config2"].children["pipes"].widgets
+
+
+def test_set_from_dict_notifies_each_form_once(app):
+    calls = []
+
+    class Inner(Form):
+        a = IntegerField("A")
+        b = IntegerField("B")
+
+        def on_change(self, attr, this_item):
+            calls.append(attr)
+            return True
+
+    class Outer(Form):
+        x = FloatField("X")
+        inner = Inner("Inner")
+
+        def on_change(self, attr, this_item):
+            calls.append(attr)
+            return True
+
+    form = Outer.build("Outer")
+    form.set_from_dict({"x": 1.5, "inner": {"a": 1, "b": 2}})
+    assert calls == ["inner", "__root__"]
+    assert form.as_dict() == {"x": 1.5, "inner": {"a": 1, "b": 2}}
+    assert form.node.children["inner"].children["b"].widgets[1].text() == "2"
+    with pytest.raises(ValueError):
+        form.set_from_dict({"missing": 1})
+
+
+def test_keystrokes_are_delivered_once_per_form(app):
+    batches = []
+
+    class Inner(Form):
+        a = IntegerField("A")
+        b = StringField("B")
+
+        def on_change_batch(self, attrs, this_item):
+            batches.append(("inner", attrs))
+            return True
+
+    class Outer(Form):
+        inner = Inner("Inner")
+        x = FloatField("X")
+
+        def on_change_batch(self, attrs, this_item):
+            batches.append(("outer", attrs))
+            return True
+
+    form = Outer.build("Outer")
+    inner = form.node.children["inner"]
+    QTest.keyClicks(inner.children["a"].widgets[1], "123")
+    QTest.keyClicks(inner.children["b"].widgets[1], "abc")
+    QTest.keyClicks(form.node.children["x"].widgets[1], "1.5")
+    assert not batches
+    app.processEvents()
+    assert batches == [("inner", {"a", "b"}), ("outer", {"inner", "x"})]
+    assert form.inner.a == 123
+
+
+def test_background_results_of_stale_runs_are_dropped(app):
+    release = threading.Event()
+    results = []
+
+    class Slow(Form):
+        a = IntegerField("A")
+
+        @staticmethod
+        def on_change_background(values):
+            if values.a == 1:
+                release.wait(5)
+            return values.a * 2
+
+        def on_background_result(self, result, this_item):
+            results.append(result)
+
+    form = Slow.build("Slow")
+    form.set_from_dict({"a": 1})
+    form.set_from_dict({"a": 2})
+    release.set()
+    deadline = time.monotonic() + 5
+    while runner().running(form.node) and time.monotonic() < deadline:
+        app.processEvents()
+    time.sleep(0.05)
+    app.processEvents()
+    assert results == [4]
+
+
+def test_frozen_form_is_read_only_and_picklable():
+    values = FrozenForm({"x": 1.5, "inner": {"a": 1}})
+    assert values.inner.a == 1
+    assert pickle.loads(pickle.dumps(values)) == values
+    with pytest.raises(AttributeError):
+        values.x = 2
+
+
+def test_async_on_change_is_cancelled_by_newer_changes(app):
+    started, finished, outer = [], [], []
+
+    class Inner(Form):
+        a = IntegerField("A")
+
+        async def on_change(self, attr, this_item):
+            value = this_item.children["a"].value
+            started.append(value)
+            await asyncio.sleep(0.01)
+            finished.append(value)
+            return True
+
+    class Outer(Form):
+        inner = Inner("Inner")
+
+        def on_change(self, attr, this_item):
+            outer.append(attr)
+            return True
+
+    form = Outer.build("Outer")
+    form.set_from_dict({"inner": {"a": 1}})
+    app.run_until_complete(asyncio.sleep(0))
+    form.set_from_dict({"inner": {"a": 2}})
+    app.run_until_complete(asyncio.sleep(0.05))
+    app.processEvents()
+    assert started == [1, 2]
+    assert finished == [2]
+    assert outer == ["__root__"]
+
+
+def test_loop_waits_on_sockets_without_polling(app, monkeypatch):
+    selects = []
+    select = app._selector.select
+    monkeypatch.setattr(app._selector, "select", lambda timeout=None: selects.append(timeout) or select(timeout))
+    reader, writer = socket.socketpair()
+    reader.setblocking(False)
+    QTimer.singleShot(100, lambda: writer.send(b"x"))
+    start = time.perf_counter()
+    assert app.run_until_complete(app.loop.sock_recv(reader, 1)) == b"x"
+    assert time.perf_counter() - start < 1
+    # Waiting for the socket steps the loop a few times, polling every 5 ms would take 20
+    assert len(selects) < 10
+    reader.close()
+    writer.close()
+
+
+def test_headless_form_attaches_view_later(app):
+    form = TestForm.build("Test", headless=True)
+    assert not form.node.widgets
+    form.set_from_dict({"mass": 7, "config": {"employee": {"level": "Pro"}}})
+    assert form.mass == 7.0
+    assert form.as_dict()["config"]["employee"]["level"] == "Pro"
+
+    form.attach_view("Window")
+    assert form.widget().windowTitle() == "Window"
+    assert form.node.children["mass"].widgets[1].text() == "7"
+    assert form.config.employee.level == "Pro"
+
+
+def test_values_are_set_without_parsing_their_text(app, monkeypatch):
+    monkeypatch.setattr(validator, "SYSTEM_SEPARATOR", ",")
+    monkeypatch.setattr(validator, "INVALID_SEPARATOR", ".")
+
+    class Sample(Form):
+        mass = FloatField("Mass", range=FloatRange(0, 10))
+        count = IntegerField("Count")
+
+    form = Sample.build("Sample", headless=True)
+    form.mass = 0.1
+    form.set_from_dict({"count": 3})
+    assert form.as_dict() == {"mass": 0.1, "count": 3}
+    form.set_from_dict({"mass": 2.5})
+    form.attach_view("Sample")
+    edit = form.node.children["mass"].widgets[1]
+    assert edit.text() == "2,5" and form.mass == 2.5
+    form.mass = 0.25
+    assert edit.text() == "0,25" and form.mass == 0.25
+    with pytest.raises(ValueError):
+        form.mass = 11
+    with pytest.raises(ValueError):
+        form.count = 1.5
+    assert form.as_dict() == {"mass": 0.25, "count": 3}
+
+
+HEADLESS_SCRIPT = """
+from PyQt5.QtWidgets import QApplication
+from magiqt.field.fields import IntegerField
+from magiqt.layout_manager.form import Form
+
+calls = []
+
+class Record(Form):
+    a = IntegerField("A")
+    b = IntegerField("B")
+
+    def on_change(self, attr, this_item):
+        calls.append(attr)
+        return True
+
+form = Record.build("Record", headless=True)
+form.set_from_dict({"a": 1, "b": "x"})
+assert QApplication.instance() is None
+print(form.as_dict(), calls)
+"""
+
+
+def test_headless_form_runs_without_application():
+    result = subprocess.run([sys.executable, "-c", HEADLESS_SCRIPT], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "{'a': 1, 'b': None} ['__root__']"
+
+
+def test_snapshot_restores_typed_values(app, tmp_path):
+    values = {"name": "Zoë", "mass": 0.1, "combo": "test3", "config": {"pipes": 2**70, "employee": {"level": "Pro"}}}
+    form = TestForm.build("Test", headless=True)
+    form.set_from_dict(values)
+    path = tmp_path / "form.snapshot"
+    with open(path, "wb") as file:
+        data = form.snapshot(file)
+    assert path.read_bytes() == data
+
+    for headless in (True, False):
+        restored = TestForm.build("Restored", headless=headless)
+        with open(path, "rb") as file:
+            restored.restore(file)
+        assert restored.as_dict() == form.as_dict()
+    assert restored.node.children["combo"].widgets[1].text() == "test3"
+
+    with pytest.raises(ValueError, match="different schema"):
+        Form.build("Other", headless=True).restore(data)
+    with pytest.raises(ValueError, match="truncated"):
+        restored.restore(data[:-30])
+
+
+def test_snapshot_values_of_other_types():
+    fingerprint = bytes(16)
+    values = [True, False, None, 1, 2**70, 0.5, "text", (1, "a"), [1.5, None]]
+    data = b"".join(encode(fingerprint, values))
+    decoded = decode(data, fingerprint)
+    assert decoded == values and list(map(type, decoded)) == list(map(type, values))
+    stream = io.BytesIO(data + b"rest")
+    assert decode_file(stream, fingerprint) == values and stream.read() == b"rest"
+    with pytest.raises(ValueError, match="Cannot snapshot"):
+        encode(fingerprint, [object()])
+
+
+def test_schema_fingerprint_follows_declarations():
+    class First(Form):
+        value = IntegerField("Value")
+
+    class Renamed(Form):
+        other = IntegerField("Value")
+
+    class Retyped(Form):
+        value = FloatField("Value")
+
+    class Same(Form):
+        value = IntegerField("Other label")
+
+    fingerprints = {form.schema.fingerprint() for form in (First, Renamed, Retyped)}
+    assert len(fingerprints) == 3
+    assert Same.schema.fingerprint() == First.schema.fingerprint()
+
+
+IMPORT_SCRIPT = """
+import sys
+
+from magiqt.field.fields import IntegerField, FloatField
+from magiqt.layout_manager.form import Form
+import unit_system.quantity
+
+class Record(Form):
+    a = IntegerField("A")
+    b = FloatField("B")
+
+form = Record.build("Record", headless=True)
+form.set_from_dict({"a": 1, "b": "2.5"})
+loaded = sorted({name.split(".")[0] for name in sys.modules} & {"PyQt5", "numpy"})
+print(loaded)
+"""
+
+
+def test_declarations_import_without_qt():
+    result = subprocess.run([sys.executable, "-c", IMPORT_SCRIPT], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,90 @@
+import pytest
+from PyQt5.QtTest import QTest
+
+from magiqt.field.fields import FloatField, IntegerField, StringField
+from magiqt.layout_manager.form import Form
+from magiqt.main import TestForm
+
+
+class Inner(Form):
+    a = IntegerField("A")
+    b = StringField("B")
+
+    def on_change_batch(self, attrs, this_item):
+        BATCHES.append(("inner", attrs))
+        return True
+
+
+class Outer(Form):
+    x = FloatField("X")
+    inner = Inner("Inner")
+
+    def on_change_batch(self, attrs, this_item):
+        BATCHES.append(("outer", attrs))
+        return True
+
+
+BATCHES = []
+
+
+@pytest.fixture
+def form(app):
+    BATCHES.clear()
+    form = Outer.build("Outer")
+    form.enable_history()
+    return form
+
+
+def test_keystrokes_merge_into_one_step(form):
+    edit = form.node.children["x"].widgets[1]
+    QTest.keyClicks(edit, "12.5")
+    form.inner.b = "text"
+    assert len(form.history) == 2
+
+    assert form.history.undo()
+    assert form.inner.b == "" and form.x == 12.5
+    assert form.history.undo()
+    assert edit.text() == "" and form.x is None
+    assert not form.history.undo()
+
+    assert form.history.redo() and form.history.redo()
+    assert (form.x, form.inner.b) == (12.5, "text")
+    assert not form.history.can_redo()
+
+
+def test_bulk_changes_undo_in_one_batch(form):
+    form.set_from_dict({"x": 1.5, "inner": {"a": 1, "b": "one"}})
+    form.set_from_dict({"x": 2.5, "inner": {"a": 2, "b": "two"}})
+    BATCHES.clear()
+    form.history.undo()
+    assert form.as_dict() == {"x": 1.5, "inner": {"a": 1, "b": "one"}}
+    assert BATCHES == [("inner", frozenset({"a", "b"})), ("outer", frozenset({"x", "inner"}))]
+    form.history.undo()
+    assert form.as_dict() == {"x": None, "inner": {"a": None, "b": ""}}
+    form.history.redo()
+    form.restore(Outer.build("Other", headless=True).snapshot())
+    assert not form.history.can_redo()
+    form.history.undo()
+    assert form.as_dict() == {"x": 1.5, "inner": {"a": 1, "b": "one"}}
+
+
+def test_oldest_steps_are_evicted(app):
+    form = Outer.build("Outer", headless=True)
+    history = form.enable_history(max_steps=10, max_deltas=4, merge_s=0)
+    for value in range(5):
+        form.x = value
+    form.set_from_dict({"inner": {"a": 1, "b": "one"}})
+    assert len(history) == 3
+    while history.undo():
+        pass
+    assert form.x == 2 and form.inner.a is None
+
+
+def test_dropdown_undo_restores_the_key(app):
+    form = TestForm.build("Test")
+    form.enable_history(merge_s=0)
+    form.combo = "test3"
+    form.combo = "test2"
+    form.history.undo()
+    assert form.combo == "test3"
+    assert form.node.children["combo"].widgets[1].text() == "test3"
@@ -0,0 +1,63 @@
+import json
+
+from magiqt import profiling
+from magiqt.field.fields import FloatField
+from magiqt.layout_manager.form import Form
+
+
+class Inner(Form):
+    value = FloatField("Value")
+
+
+class Outer(Form):
+    inner = Inner("Inner")
+
+
+class Other(Form):
+    value = FloatField("Value")
+
+
+def test_events_are_recorded_only_while_enabled(app, tmp_path):
+    profiling.reset()
+    Outer.build("Outer")
+    assert not profiling.summary()
+
+    profiling.enable()
+    try:
+        form = Outer.build("Outer")
+        form.set_from_dict({"inner": {"value": "1.5"}})
+    finally:
+        profiling.disable()
+
+    assert profiling.stat("build", "Outer").count == 1
+    assert profiling.stat("create_widgets", "Inner").count == 1
+    assert profiling.stat("validation", "Inner.value").count >= 1
+    assert profiling.stat("on_change", "Outer").count == 1
+    depths = {event.name: event.args["depth"] for event in profiling.PROFILER.events if event.category == "on_change"}
+    assert depths == {"Inner": 1, "Outer": 0}
+
+    profiling.dump_chrome_trace(str(tmp_path / "trace.json"))
+    profiling.dump_json(str(tmp_path / "stats.json"))
+    trace = json.loads((tmp_path / "trace.json").read_text())
+    assert {event["cat"] for event in trace["traceEvents"]} >= {"build", "on_change", "validation"}
+    assert json.loads((tmp_path / "stats.json").read_text())["build"]["Outer"]["count"] == 1
+    profiling.reset()
+
+
+def test_cache_hits_and_conversion_are_reported_per_field():
+    validator = Inner.value.cached_validator()
+    validator.invalidate()
+    profiling.reset()
+    profiling.enable()
+    try:
+        for _ in range(3):
+            assert validator.converted("2.75") == 2.75
+        assert Other.value.cached_validator().converted("2.75") == 2.75
+    finally:
+        profiling.disable()
+    assert profiling.stat("validation", "Inner.value").count == 1
+    assert profiling.stat("conversion", "Inner.value").count == 1
+    assert profiling.stat("validation_hit", "Inner.value").count == 2
+    assert profiling.stat("validation", "Other.value").count == 1
+    assert "validation_hit" not in {event.category for event in profiling.PROFILER.events}
+    profiling.reset()
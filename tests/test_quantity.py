@@ -0,0 +1,112 @@
+import pytest
+from PyQt5.QtTest import QTest
+
+from magiqt.field import validator
+from magiqt.field.fields import QuantityField
+from magiqt.layout_manager.form import Form
+from unit_system.array import QuantityArray
+from unit_system.quantity import Force, Pressure, QuantityType, Temperature
+from unit_system.unit import Unit
+
+
+class Conditions(Form):
+    pressure = QuantityField("Pressure", quantity=Pressure, unit="bar(a)")
+    temperature = QuantityField("Temperature", quantity=Temperature)
+
+
+def test_values_are_stored_in_base_units(app):
+    form = Conditions.build("Conditions")
+    edit, units = form.node.children["pressure"].widgets[1:]
+    QTest.keyClicks(edit, "1.5")
+    assert form.pressure == 150000.0
+    units.setCurrentText("bar(g)")
+    assert edit.text() == "0.5" and form.pressure == 150000.0
+    QTest.keyClicks(edit, "5")
+    assert form.pressure == 155000.0
+    assert form.as_dict() == {"pressure": 155000.0, "temperature": None}
+
+
+def test_switching_units_does_not_drift(app):
+    form = Conditions.build("Conditions")
+    form.temperature = 300.1
+    edit, units = form.node.children["temperature"].widgets[1:]
+    for _ in range(50):
+        units.setCurrentText("℃")
+        units.setCurrentText("K")
+    assert form.temperature == 300.1
+    units.setCurrentText("℃")
+    assert edit.text() == "26.95"
+
+
+def test_headless_values_show_in_the_initial_unit(app):
+    form = Conditions.build("Conditions", headless=True)
+    form.set_from_dict({"pressure": 250000})
+    form.attach_view()
+    assert form.node.children["pressure"].widgets[1].text() == "2.5"
+    assert form.pressure == 250000.0
+
+
+def test_converters_are_cached_per_unit_pair():
+    to_celsius = Temperature.converter("K", "℃")
+    assert Temperature.converter(Temperature["K"], "℃") is to_celsius
+    assert to_celsius(273.15) == 0
+    assert Pressure.convert(2, "bar(a)", "Pa") == 200000
+
+
+def test_arrays_are_converted_with_one_transform():
+    np = pytest.importorskip("numpy")
+    pascal = np.array([0.0, 100000.0, 250000.0])
+    assert np.allclose(Pressure.convert(pascal, "Pa", "bar(g)"), [Pressure.convert(v, "Pa", "bar(g)") for v in pascal])
+    assert Pressure.transform("Pa", "bar(g)") == (1e-5, -1.0)
+    result = Pressure.convert_array(pascal, "Pa", "bar(a)", out=pascal)
+    assert result is pascal and np.allclose(pascal, [0.0, 1.0, 2.5])
+
+
+def test_quantity_array_converts_lazily_and_in_place():
+    np = pytest.importorskip("numpy")
+    data = np.array([273.15, 300.0])
+    kelvin = QuantityArray(data, Temperature, "K")
+    celsius = kelvin.to("℃")
+    assert np.allclose(celsius.values, [0.0, 26.85]) and kelvin.values is data
+    kelvin.convert("℃")
+    assert kelvin.unit == "℃" and np.allclose(data, [0.0, 26.85])
+    assert np.allclose(np.asarray(celsius.to("K")), [273.15, 300.0])
+
+
+def test_units_are_looked_up_by_name():
+    assert Pressure["bar(g)"] is Pressure.units[2] and Pressure[Unit("bar(a)", 100000)] is Pressure.units[1]
+    with pytest.raises(ValueError):
+        _ = Pressure[Unit("bar(a)", 1e5, 1)]
+    with pytest.raises(ValueError):
+        QuantityType("Length", Unit("m"), Unit("m", 2))
+    assert hash(QuantityType("Force", Unit("N"), Unit("kN", 1000))) == hash(Force)
+    assert (
+        Pressure.converter("Pa", "bar(g)")(150000.0) == pytest.approx(0.5) and Temperature.convert(1.0, "K", "K") == 1.0
+    )
+
+
+def test_switching_units_reuses_the_qt_validator(app):
+    form = Conditions.build("Conditions")
+    edit, units = form.node.children["pressure"].widgets[1:]
+    wrapper = edit.validator()
+    units.setCurrentText("Pa")
+    units.setCurrentText("bar(g)")
+    assert edit.validator() is wrapper and len(edit.findChildren(type(wrapper))) == 1
+    assert wrapper.wrapped is Conditions.pressure.cached_validator("bar(g)")
+
+
+def test_base_values_are_not_parsed_from_text(app, monkeypatch):
+    monkeypatch.setattr(validator, "SYSTEM_SEPARATOR", ",")
+    monkeypatch.setattr(validator, "INVALID_SEPARATOR", ".")
+
+    class Line(Form):
+        pressure = QuantityField("Pressure", quantity=Pressure, unit="bar(a)")
+
+    form = Line.build("Line")
+    form.enable_history()
+    form.set_from_dict({"pressure": 250000.0})
+    edit = form.node.children["pressure"].widgets[1]
+    assert form.pressure == 250000.0 and edit.text() == "2,5"
+    form.set_from_dict({"pressure": 125000.0})
+    assert form.history.undo()
+    assert form.pressure == 250000.0 and edit.text() == "2,5"
@@ -0,0 +1,90 @@
+import pytest
+
+from magiqt.field.range import FloatRange, IndexedRange, IntRange, LazyRange, ListRange, MappedRange
+
+
+def test_indexed_range_lookups():
+    range_ = IndexedRange(("a", "b", "a", "c"), (1, 2, 3, 4))
+    assert range_.display_role(3) == "c"
+    assert range_.item(1) == 2
+    assert range_.index_of("a") == 0
+    assert range_.to_range_item("c") == 4
+    assert "b" in range_ and "d" not in range_
+    with pytest.raises(ValueError):
+        range_.index_of("d")
+
+
+def test_rows_of_items():
+    range_ = MappedRange({f"key {i}": (i, "item") for i in range(50_000)})
+    assert range_.row_of_item((49_999, "item")) == 49_999
+    assert range_._indexed._item_rows is not None  # pylint: disable=W0212
+    assert IndexedRange(("a", "b"), ([1], [2])).row_of_item([2]) == 1
+    assert ListRange(["x", "y"]).row_of_item("y") == 1
+    with pytest.raises(ValueError):
+        range_.row_of_item((50_000, "item"))
+
+
+def test_indexed_range_without_reverse_index():
+    range_ = IndexedRange(["x", "y"], reverse_index=False)
+    assert range_.index_of("y") == 1
+    assert "x" in range_
+    with pytest.raises(ValueError):
+        range_.index_of("z")
+
+
+def test_mapped_and_list_range_positions():
+    mapped = MappedRange({"one": 1, "two": 2})
+    assert (mapped.display_role(1), mapped.item(1), mapped.index_of("one")) == ("two", 2, 0)
+    listed = ListRange(["Pro", "Average"])
+    assert (len(listed), listed.index_of("Average"), listed.item(0)) == (2, 1, "Pro")
+    assert listed == ListRange(["Pro", "Average"])
+
+
+def test_mapped_and_list_ranges_do_not_follow_their_arguments():
+    items = {"one": 1}
+    keys = ["one"]
+    mapped, listed = MappedRange(items), ListRange(keys)
+    items["two"] = 2
+    keys.append("two")
+    assert "two" not in mapped and len(mapped) == 1 and mapped.gui_items() == ("one",)
+    assert "two" not in listed and len(listed) == 1 and listed.gui_items() == ("one",)
+
+
+def test_lazy_range_loads_pages_on_demand():
+    calls = []
+
+    def pages(offset, limit):
+        calls.append(offset)
+        return [f"item{i}" for i in range(offset, min(offset + limit, 25))]
+
+    range_ = LazyRange.from_loader(pages, page_size=10)
+    assert len(range_) == 0 and range_.can_fetch_more()
+    assert range_.fetch_more() == 10
+    assert range_.display_role(12) == "item12" and calls == [0, 10]
+    assert range_.index_of("item24") == 24 and not range_.can_fetch_more()
+    assert "item99" not in range_
+    with pytest.raises(ValueError):
+        range_.index_of("item99")
+
+
+def test_lazy_range_from_iterable_with_lookup():
+    range_ = LazyRange.from_iterable((str(i) for i in range(1000)), page_size=100)
+    assert "5" in range_ and len(range_) == 100
+    looked_up = LazyRange.from_loader(lambda offset, limit: [], lookup=lambda item: item == "x")
+    assert "x" in looked_up and len(looked_up) == 0
+
+
+def test_lazy_range_membership_loads_at_most_scan_limit_items():
+    range_ = LazyRange.from_iterable((str(i) for i in range(100_000)), page_size=100)
+    range_.scan_limit = 1000
+    assert "missing" not in range_ and len(range_) == 1000
+    assert "999" in range_ and "5000" not in range_ and len(range_) == 1000
+    with pytest.raises(ValueError):
+        range_.index_of("5000")
+
+
+def test_numeric_ranges_respect_inclusive_bounds():
+    assert 10 in IntRange(0, 10)
+    assert 10 not in IntRange(0, 10, high_inclusive=False)
+    assert 1.0 not in FloatRange(2, 10)
+    assert list(FloatRange(0, 1, low_inclusive=False).contains_many([0.0, 0.5, 1.0, 2.0])) == [False, True, True, False]
@@ -0,0 +1,37 @@
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QStyleOptionViewItem
+
+from magiqt.layout_manager.table import TableForm
+from magiqt.main import TestForm
+from magiqt.widgets.input.combo_box import ComboBox
+from magiqt.widgets.input.line_edit import LineEdit
+
+
+def test_records_are_stored_per_column(app):
+    table = TableForm(TestForm, [{"name": "a", "mass": 1.5, "config": {"pipes": 3}}, {"mass": "heavy"}])
+    model = table.model
+    assert model.rowCount() == 2
+    assert model.headerData(1, Qt.Horizontal) == "Mass"
+    assert model.value(0, "config.pipes") == 3
+    assert model.record(0)["config"]["pipes"] == 3
+    assert model.value(1, "mass") is None
+    assert not model.is_valid(1)
+    assert model.data(model.index(1, 1)) == "heavy"
+    assert model.data(model.index(1, 1), Qt.ForegroundRole) is not None
+
+
+def test_cells_are_validated_and_edited_with_field_widgets(app):
+    table = TableForm(TestForm, [{"mass": 1.0, "combo": "test1"}])
+    model = table.model
+    mass = model.index(0, 1)
+    assert not model.setData(mass, "abc")
+    assert model.setData(mass, "2.5")
+    assert model.value(0, "mass") == 2.5
+
+    delegate = table.view.itemDelegate()
+    editor = delegate.createEditor(table.view, QStyleOptionViewItem(), mass)
+    assert isinstance(editor, LineEdit)
+    delegate.setEditorData(editor, mass)
+    assert editor.text() == "2.5"
+    combo = model.index(0, 2)
+    assert isinstance(delegate.createEditor(table.view, QStyleOptionViewItem(), combo), ComboBox)
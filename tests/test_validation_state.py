@@ -0,0 +1,33 @@
+from PyQt5.QtGui import QColor, QPalette
+from PyQt5.QtWidgets import QLineEdit
+
+from magiqt.interface import ValidatorResult
+from magiqt.widgets.input.validation_state import StateRenderer, ValidationTheme
+
+VALID = ValidatorResult.State.VALID
+INTERMEDIATE = ValidatorResult.State.INTERMEDIATE
+
+
+def test_widgets_are_restyled_only_on_transitions(app):
+    renderer = StateRenderer()
+    first, second = QLineEdit(), QLineEdit()
+    assert renderer.render(first, VALID)
+    assert not renderer.render(first, VALID)
+    assert renderer.render(first, INTERMEDIATE)
+    assert first.palette().color(QPalette.Text).name() == "#ff0000"
+    assert renderer.render(second, INTERMEDIATE)
+    assert renderer.state(second) is INTERMEDIATE
+
+    renderer.theme = ValidationTheme(intermediate="orange")
+    assert renderer.render(first, INTERMEDIATE)
+    assert first.palette().color(QPalette.Text).name() == "#ffa500"
+
+
+def test_palettes_of_single_widgets_are_kept(app):
+    edit = QLineEdit()
+    palette = edit.palette()
+    palette.setColor(QPalette.Base, QColor("yellow"))
+    edit.setPalette(palette)
+    StateRenderer().render(edit, INTERMEDIATE)
+    assert edit.palette().color(QPalette.Base).name() == "#ffff00"
+    assert edit.palette().color(QPalette.Text).name() == "#ff0000"
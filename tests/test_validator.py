@@ -0,0 +1,58 @@
+import pytest
+
+from magiqt.field.range import FloatRange, IntRange
+from magiqt.field.fields import IntegerField
+from magiqt.field.validator import CachedValidator, FloatValidator, IntValidator, SYSTEM_SEPARATOR
+from magiqt.interface import ValidatorResult
+
+VALID = ValidatorResult.State.VALID.value
+INTERMEDIATE = ValidatorResult.State.INTERMEDIATE.value
+
+
+@pytest.mark.parametrize(
+    "validator, values",
+    [
+        (FloatValidator(FloatRange(0, 10)), ["1.5", "", "abc", "1,5", " 7", "1e3", "-2", "10", "nan"]),
+        (IntValidator(IntRange(0, 10)), ["3", "", "3.0", "x", "11", " 4 ", "99999999999999999999", "10"]),
+    ],
+)
+def test_validate_many_matches_validate(validator, values):
+    values = [value.replace(".", SYSTEM_SEPARATOR) for value in values]
+    result = validator.validate_many(values)
+    for value, state, inside in zip(values, result.states, result.in_range):
+        single = validator.validate(value)
+        assert state == single.state.value
+        assert inside == (single.state == ValidatorResult.State.VALID)
+
+
+def test_validate_many_returns_parsed_values():
+    result = IntValidator(IntRange(0, 10)).validate_many(["5", "x", "20"])
+    assert list(result.states) == [VALID, INTERMEDIATE, INTERMEDIATE]
+    assert list(result.in_range) == [True, False, False]
+    converted = list(result.converted)
+    assert converted[0] == 5 and converted[2] == 20
+    assert converted[1] is None or result.converted.mask[1]
+
+
+def test_cached_validator_parses_each_text_once():
+    field = IntegerField("A", range=IntRange(0, 10))
+    cached = field.cached_validator()
+    assert cached.validate("5").state == ValidatorResult.State.VALID
+    assert cached.converted("5") == 5
+    assert cached.converted("20") == 20
+    assert cached.validate("20").state == ValidatorResult.State.INTERMEDIATE
+    assert (cached.hits, cached.misses) == (2, 2)
+
+    cached.wrapped.range = IntRange(0, 30)
+    assert cached.validate("20").state == ValidatorResult.State.VALID
+    assert cached.misses == 3
+    field.range = IntRange(0, 1)
+    assert field.cached_validator() is not cached
+
+
+def test_cached_validator_is_bounded():
+    cached = CachedValidator(FloatValidator(FloatRange()), maxsize=2)
+    for text in ("1", "2", "3", "1"):
+        cached.converted(text)
+    assert len(cached) == 2
+    assert cached.misses == 4